@@ -0,0 +1,146 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import time
+
+import numpy as np
+
+from graph import neighbour_lists, dense_matrix
+
+# the local search keeps a dense boolean adjacency matrix, above this many
+# nodes only the greedy construction runs
+CLIQUE_MAX_NODES = 5000
+
+
+def greedy_clique(adjacency, start):
+    # grows a clique from start, always adding the candidate with most
+    # neighbours among the remaining candidates
+    clique = [start]
+    candidates = set(adjacency[start])
+    while candidates:
+        node = max(candidates, key=lambda c: len(candidates.intersection(adjacency[c])))
+        clique.append(node)
+        candidates.intersection_update(adjacency[node])
+    return clique
+
+
+def greedy_clique_dense(matrix, start):
+    # greedy_clique on a boolean adjacency matrix, the candidate counts are one
+    # submatrix sum per step
+    clique = [start]
+    candidates = matrix[start].copy()
+    while candidates.any():
+        index = np.flatnonzero(candidates)
+        counts = matrix[np.ix_(index, index)].sum(axis=1)
+        node = index[np.argmax(counts)]
+        clique.append(node)
+        candidates &= matrix[node]
+    return clique
+
+
+def local_search_clique(matrix, clique, time_limit, target=None, tabu_tenure=7):
+    # add moves when a node is adjacent to the whole clique, otherwise swap in
+    # a node missing exactly one clique member; swapped out nodes are tabu for a
+    # few iterations; missing[v] counts the clique members v is not adjacent to
+    node_count = len(matrix)
+    start = time.time()
+    non_adjacent = ~matrix
+    np.fill_diagonal(non_adjacent, False)
+
+    in_clique = np.zeros(node_count, dtype=bool)
+    in_clique[clique] = True
+    missing = non_adjacent[:, in_clique].sum(axis=1)
+    tabu_until = np.zeros(node_count, dtype=np.int64)
+    best = list(clique)
+    iteration = 0
+
+    while time.time() - start < time_limit:
+        if target is not None and len(best) >= target:
+            break
+        iteration += 1
+        allowed = ~in_clique & (tabu_until <= iteration)
+        addable = np.flatnonzero(allowed & (missing == 0))
+        if len(addable):
+            node = addable[np.random.randint(len(addable))]
+            in_clique[node] = True
+            missing += non_adjacent[node]
+            if in_clique.sum() > len(best):
+                best = np.flatnonzero(in_clique).tolist()
+            continue
+
+        swappable = np.flatnonzero(allowed & (missing == 1))
+        if len(swappable) == 0:
+            # plateau exhausted: drop a random member to move elsewhere
+            members = np.flatnonzero(in_clique)
+            if len(members) == 0:
+                break
+            out = members[np.random.randint(len(members))]
+            in_clique[out] = False
+            missing -= non_adjacent[out]
+            tabu_until[out] = iteration + tabu_tenure
+            continue
+
+        node = swappable[np.random.randint(len(swappable))]
+        out = np.flatnonzero(in_clique & non_adjacent[node])[0]
+        in_clique[out] = False
+        missing -= non_adjacent[out]
+        tabu_until[out] = iteration + tabu_tenure
+        in_clique[node] = True
+        missing += non_adjacent[node]
+
+    return best
+
+
+def max_clique(graph, time_limit=5.0, starts=10, target=None):
+    # large clique in bounded time: greedy from the highest degree nodes, then
+    # local search from the best one for what is left of the time limit; the
+    # search stops early once the clique reaches target (e.g. a coloring's size)
+    start = time.time()
+    node_count = graph.node_count
+    order = np.argsort(-graph.degree, kind='stable').tolist()
+    if node_count == 0:
+        return []
+    if node_count > CLIQUE_MAX_NODES:
+        neighbour_sets = [set(nodes) for nodes in neighbour_lists(graph)]
+        return greedy_clique(neighbour_sets, order[0])
+
+    matrix = dense_matrix(graph)
+
+    best = []
+    for node in order[:starts]:
+        clique = greedy_clique_dense(matrix, node)
+        if len(clique) > len(best):
+            best = clique
+        if time.time() - start > time_limit / 2:
+            break
+
+    remaining = time_limit - (time.time() - start)
+    if remaining > 0:
+        best = local_search_clique(matrix, best, remaining, target)
+    return [int(node) for node in best]
+
+
+def edge_clique_cover(graph):
+    # cliques covering every edge at least once: each clique starts from an
+    # uncovered edge (u, v) and grows with common neighbours that still have an
+    # uncovered edge to u, so every clique covers something new
+    adjacency = [set(nodes) for nodes in neighbour_lists(graph)]
+    uncovered = [set(nodes) for nodes in adjacency]
+    cover = []
+    for u in range(graph.node_count):
+        while uncovered[u]:
+            v = min(uncovered[u])
+            clique = [u, v]
+            candidates = adjacency[u] & adjacency[v]
+            fresh = candidates & uncovered[u]
+            while fresh:
+                node = min(fresh)
+                clique.append(node)
+                candidates &= adjacency[node]
+                fresh &= candidates
+            for i, a in enumerate(clique):
+                for b in clique[i + 1:]:
+                    uncovered[a].discard(b)
+                    uncovered[b].discard(a)
+            cover.append(clique)
+    return cover
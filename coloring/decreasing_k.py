@@ -0,0 +1,90 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# instead of one minimisation, asks k = UB-1, UB-2, ... for a feasible
+# coloring, each a short CP-SAT or tabucol run warm started from the last
+# coloring with its top color class recolored
+
+import random
+import time
+
+from ortools.sat.python import cp_model
+
+from graph import neighbour_lists
+from greedy import color_count
+from clique import edge_clique_cover
+from models import build_k_coloring_model
+from tabucol import neighbour_arrays, tabucol
+
+
+def drop_top_color(adjacency, colors, k):
+    # moves every node colored k or above to its smallest color below k free
+    # among its neighbours, or to a random one when none is free
+    colors = list(colors)
+    for node in range(len(colors)):
+        if colors[node] >= k:
+            used = set(colors[neighbour] for neighbour in adjacency[node])
+            free = [color for color in range(k) if color not in used]
+            colors[node] = free[0] if free else random.randrange(k)
+    return colors
+
+
+def is_valid(adjacency, colors):
+    return all(colors[node] != colors[neighbour]
+               for node in range(len(colors)) for neighbour in adjacency[node])
+
+
+def cp_sat_step(graph, k, hint, clique, cover, time_limit, search_workers):
+    # returns (colors or None, infeasible)
+    cpmodel, node_color_cp = build_k_coloring_model(graph, k, hint, clique, cover)
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit
+    solver.parameters.num_search_workers = search_workers
+    status = solver.Solve(cpmodel)
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return [solver.Value(v) for v in node_color_cp], False
+    return None, status == cp_model.INFEASIBLE
+
+
+def tabucol_step(neighbours, k, hint, time_limit):
+    colors, conflicts = tabucol(neighbours, hint, k, max_iterations=10**9, time_limit=time_limit)
+    if conflicts == 0:
+        return colors.tolist(), False
+    return None, False
+
+
+def decreasing_k(graph, colors, clique, lower_bound, step='cp_sat', step_time_limit=60.0,
+                 time_limit=600.0, search_workers=8):
+    # colors is a valid coloring with the clique on colors 0..len(clique)-1;
+    # stops at the clique bound, when a step fails inside its budget or when
+    # CP-SAT proves a k infeasible; returns (best colors, proven optimal)
+    start = time.time()
+    adjacency = neighbour_lists(graph)
+    if step == 'cp_sat':
+        cover = edge_clique_cover(graph)
+    else:
+        neighbours = neighbour_arrays(graph)
+    best = list(colors)
+    k = color_count(best)
+
+    while k - 1 >= max(lower_bound, 1):
+        budget = min(step_time_limit, time_limit - (time.time() - start))
+        if budget <= 0:
+            break
+        hint = drop_top_color(adjacency, best, k - 1)
+        if is_valid(adjacency, hint):
+            # recoloring the top class was already enough
+            found, infeasible = hint, False
+        elif step == 'cp_sat':
+            found, infeasible = cp_sat_step(graph, k - 1, hint, clique, cover, budget, search_workers)
+        else:
+            found, infeasible = tabucol_step(neighbours, k - 1, hint, budget)
+        if infeasible:
+            print('no coloring with', k - 1, 'colors')
+            return best, True
+        if found is None:
+            break
+        best = found
+        k = color_count(best)
+        print(step, k, 'colors after', round(time.time() - start, 2), 's')
+    return best, k <= lower_bound
@@ -0,0 +1,86 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import sys
+import time
+
+from graph import neighbour_lists
+
+
+def dsatur_bnb(graph, colors, lower_bound=0, time_limit=None, shared_best=None, on_improve=None):
+    # exact dsatur branch and bound: branch on the uncolored node with most
+    # distinct neighbour colors (ties on degree) over the colors it may take,
+    # never opening a color that would reach the best count found so far
+    # colors is a valid starting coloring; shared_best (optional) is a
+    # multiprocessing value another process may lower; on_improve(colors) is
+    # called with every better coloring
+    # returns (best colors, proven, best count) where proven means the search
+    # completed, so no coloring with fewer than best count colors exists
+    node_count = graph.node_count
+    adjacency = neighbour_lists(graph)
+    degree = graph.degree.tolist()
+    start = time.time()
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 2*node_count + 100))
+
+    best_colors = list(colors)
+    state = {'best': max(best_colors) + 1 if node_count else 0, 'nodes': 0, 'stopped': False}
+    upper = state['best']
+
+    current = [-1]*node_count
+    # neighbour_count[v][c]: colored neighbours of v with color c
+    neighbour_count = [[0]*upper for _ in range(node_count)]
+    saturation = [0]*node_count
+    uncolored = set(range(node_count))
+
+    def assign(node, color):
+        current[node] = color
+        uncolored.discard(node)
+        for neighbour in adjacency[node]:
+            if neighbour_count[neighbour][color] == 0:
+                saturation[neighbour] += 1
+            neighbour_count[neighbour][color] += 1
+
+    def unassign(node, color):
+        current[node] = -1
+        uncolored.add(node)
+        for neighbour in adjacency[node]:
+            neighbour_count[neighbour][color] -= 1
+            if neighbour_count[neighbour][color] == 0:
+                saturation[neighbour] -= 1
+
+    def out_of_budget():
+        state['nodes'] += 1
+        if state['nodes'] % 1000 == 0:
+            if time_limit is not None and time.time() - start > time_limit:
+                state['stopped'] = True
+            if shared_best is not None and shared_best.value < state['best']:
+                state['best'] = shared_best.value
+        return state['stopped']
+
+    def search(used):
+        if state['best'] <= lower_bound or out_of_budget():
+            return
+        if not uncolored:
+            state['best'] = used
+            best_colors[:] = current
+            if on_improve is not None:
+                on_improve(list(current))
+            return
+        node = max(uncolored, key=lambda v: (saturation[v], degree[v]))
+        # a new color is only opened while it keeps the count below the best
+        for color in range(min(used + 1, state['best'] - 1)):
+            if color >= state['best'] - 1:
+                # the best improved further down, this color can not beat it anymore
+                return
+            if neighbour_count[node][color] == 0:
+                assign(node, color)
+                search(max(used, color + 1))
+                unassign(node, color)
+                if state['stopped'] or state['best'] <= lower_bound:
+                    return
+
+    search(0)
+    # the search is complete unless the budget ran out; the best it closed may
+    # also be one another process found (shared_best), then best_colors is stale
+    proven = not state['stopped']
+    return best_colors, proven, state['best']
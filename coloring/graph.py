@@ -0,0 +1,60 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from collections import namedtuple
+
+import numpy as np
+
+# compressed sparse row adjacency: the neighbours of v are
+# indices[indptr[v]:indptr[v + 1]], sorted and without duplicates
+Graph = namedtuple("Graph", ['node_count', 'indptr', 'indices', 'degree'])
+
+
+def build_graph(node_count, edges):
+    # one vectorised pass over the (E, 2) edge array: both directions, drop
+    # self loops and repeated edges, sort by source and count per node
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    sources = np.concatenate((edges[:, 0], edges[:, 1]))
+    targets = np.concatenate((edges[:, 1], edges[:, 0]))
+    keep = sources != targets
+    keys = np.sort(sources[keep]*node_count + targets[keep])
+    if len(keys):
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+    sources, indices = np.divmod(keys, node_count)
+    degree = np.bincount(sources, minlength=node_count)
+    indptr = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(degree, out=indptr[1:])
+    return Graph(node_count, indptr, indices, degree)
+
+
+def neighbours(graph, node):
+    return graph.indices[graph.indptr[node]:graph.indptr[node + 1]]
+
+
+def neighbour_lists(graph):
+    # python lists per node for the heuristics that walk neighbours one by one
+    indices = graph.indices.tolist()
+    indptr = graph.indptr.tolist()
+    return [indices[indptr[node]:indptr[node + 1]] for node in range(graph.node_count)]
+
+
+def dense_matrix(graph):
+    matrix = np.zeros((graph.node_count, graph.node_count), dtype=bool)
+    matrix[np.repeat(np.arange(graph.node_count), graph.degree), graph.indices] = True
+    return matrix
+
+
+def edge_array(graph):
+    # every edge once as (u, v) with u < v
+    sources = np.repeat(np.arange(graph.node_count), graph.degree)
+    keep = sources < graph.indices
+    return np.stack((sources[keep], graph.indices[keep]), axis=1)
+
+
+def to_networkx(graph):
+    # networkx is only needed for optional analysis, keep it off the hot path
+    import networkx as nx
+    G = nx.Graph()
+    G.add_nodes_from(range(graph.node_count))
+    G.add_edges_from(edge_array(graph).tolist())
+    return G
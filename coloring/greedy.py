@@ -0,0 +1,99 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import heapq
+
+import numpy as np
+
+from graph import neighbour_lists, dense_matrix
+
+# rlf keeps a dense boolean adjacency matrix, skip it above this many nodes
+RLF_MAX_NODES = 5000
+
+
+def dsatur(graph):
+    # colors the node with the most distinct neighbour colors first (ties on degree)
+    # the heap holds (-saturation, -degree, node); stale entries are skipped on pop
+    node_count = graph.node_count
+    adjacency = neighbour_lists(graph)
+    colors = [-1]*node_count
+    neighbour_colors = [set() for _ in range(node_count)]
+    heap = [(0, -len(adjacency[node]), node) for node in range(node_count)]
+    heapq.heapify(heap)
+
+    while heap:
+        neg_saturation, _, node = heapq.heappop(heap)
+        if colors[node] != -1 or -neg_saturation != len(neighbour_colors[node]):
+            continue
+        used = neighbour_colors[node]
+        color = 0
+        while color in used:
+            color += 1
+        colors[node] = color
+        for neighbour in adjacency[node]:
+            if colors[neighbour] == -1 and color not in neighbour_colors[neighbour]:
+                neighbour_colors[neighbour].add(color)
+                heapq.heappush(heap, (-len(neighbour_colors[neighbour]),
+                                      -len(adjacency[neighbour]), neighbour))
+    return colors
+
+
+def rlf(graph):
+    # recursive largest first: builds one color class at a time, starting from
+    # the uncolored node with most uncolored neighbours and then adding the
+    # node with most neighbours already excluded from the class (W), ties going
+    # to the fewest neighbours still available (U); counts are updated
+    # incrementally with rows of a dense adjacency matrix
+    node_count = graph.node_count
+    matrix = dense_matrix(graph)
+    rows = matrix.astype(np.int32)
+
+    colors = np.full(node_count, -1, dtype=np.int64)
+    uncolored = np.ones(node_count, dtype=bool)
+    degree_uncolored = graph.degree.astype(np.int32)
+    color = 0
+    while uncolored.any():
+        available = uncolored.copy()
+        in_w = np.zeros(node_count, dtype=bool)
+        neighbours_in_w = np.zeros(node_count, dtype=np.int32)
+        neighbours_in_u = degree_uncolored.copy()
+
+        candidates = np.flatnonzero(available)
+        node = candidates[np.argmax(degree_uncolored[candidates])]
+        while True:
+            colors[node] = color
+            available[node] = False
+            neighbours_in_u -= rows[node]
+            moved = np.flatnonzero(matrix[node] & available)
+            available[moved] = False
+            in_w[moved] = True
+            if len(moved):
+                moved_rows = rows[moved].sum(axis=0)
+                neighbours_in_w += moved_rows
+                neighbours_in_u -= moved_rows
+            candidates = np.flatnonzero(available)
+            if len(candidates) == 0:
+                break
+            # most neighbours in W first, fewest in U on ties
+            key = neighbours_in_w[candidates].astype(np.int64)*(node_count + 1) - neighbours_in_u[candidates]
+            node = candidates[np.argmax(key)]
+
+        members = colors == color
+        uncolored &= ~members
+        degree_uncolored -= rows[members].sum(axis=0)
+        color += 1
+    return colors.tolist()
+
+
+def color_count(colors):
+    return max(colors) + 1 if len(colors) else 0
+
+
+def greedy_coloring(graph):
+    # best of dsatur and (when the graph is small enough) rlf
+    best = dsatur(graph)
+    if graph.node_count <= RLF_MAX_NODES:
+        candidate = rlf(graph)
+        if color_count(candidate) < color_count(best):
+            best = candidate
+    return best
@@ -0,0 +1,107 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# hybrid evolutionary coloring: a small population of k-colorings, each child
+# built by greedy partition crossover (gpx) of two parents and improved by
+# tabucol; the children of one generation are bred in a process pool. once a
+# child has no conflicts k drops by one and the population is rebuilt
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from greedy import color_count
+from tabucol import neighbour_arrays, tabucol
+
+# set in every pool process by init_worker, so the graph is sent once per process
+worker_neighbours = None
+
+
+def init_worker(graph):
+    global worker_neighbours
+    worker_neighbours = neighbour_arrays(graph)
+
+
+def gpx(parent_a, parent_b, k, random_state):
+    # alternately copies the largest remaining class of each parent into the
+    # child; class sizes are kept per parent with bincount and lowered by the
+    # nodes each step takes. nodes left at the end get a random color
+    child = np.full(len(parent_a), k, dtype=np.uint16)
+    free = np.ones(len(parent_a), dtype=bool)
+    sizes = [np.bincount(parent_a, minlength=k), np.bincount(parent_b, minlength=k)]
+    parents = (parent_a, parent_b)
+    for color in range(k):
+        parent = parents[color % 2]
+        taken = free & (parent == np.argmax(sizes[color % 2]))
+        child[taken] = color
+        free &= ~taken
+        sizes[0] -= np.bincount(parent_a[taken], minlength=k)
+        sizes[1] -= np.bincount(parent_b[taken], minlength=k)
+    child[free] = random_state.randint(k, size=int(free.sum()))
+    return child
+
+
+def improve(colors, k, iterations, time_limit, seed):
+    # runs in a pool process; returns (colors as uint16, conflicts)
+    np.random.seed(seed)
+    colors, conflicts = tabucol(worker_neighbours, colors.astype(np.int64), k, iterations, time_limit)
+    return colors.astype(np.uint16), conflicts
+
+
+def breed(parent_a, parent_b, k, iterations, time_limit, seed):
+    child = gpx(parent_a, parent_b, k, np.random.RandomState(seed))
+    return improve(child, k, iterations, time_limit, seed)
+
+
+def hea(graph, colors, lower_bound=0, population_size=10, tabu_iterations=2000,
+        time_limit=600.0, workers=None):
+    # colors is a valid coloring; returns (best colors, history) where history
+    # lists (seconds, colors) for every improvement of the best count
+    start = time.time()
+    random_state = np.random.RandomState(0)
+    best = np.array(colors, dtype=np.uint16)
+    k = int(color_count(best)) - 1
+    history = [(0.0, k + 1)]
+    seeds = iter(range(1, 2**31))
+    workers = workers or os.cpu_count()
+    generation_size = max(min(population_size // 2, workers), 1)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(graph,)) as executor:
+        while k >= max(lower_bound, 1) and time.time() - start < time_limit:
+            # population for k: the best coloring with the top classes moved to
+            # random colors below k, a different draw per member, each improved
+            population = np.repeat(best[None, :], population_size, axis=0)
+            top = population >= k
+            population[top] = random_state.randint(k, size=int(top.sum()))
+            futures = [executor.submit(improve, member, k, tabu_iterations,
+                                       time_limit - (time.time() - start), next(seeds))
+                       for member in population]
+            conflicts = np.empty(population_size, dtype=np.int64)
+            for i, future in enumerate(futures):
+                population[i], conflicts[i] = future.result()
+
+            while conflicts.min() > 0 and time.time() - start < time_limit:
+                remaining = time_limit - (time.time() - start)
+                parents = [random_state.choice(population_size, 2, replace=False)
+                           for _ in range(generation_size)]
+                futures = [executor.submit(breed, population[a], population[b], k,
+                                           tabu_iterations, remaining, next(seeds))
+                           for a, b in parents]
+                for (a, b), future in zip(parents, futures):
+                    child, child_conflicts = future.result()
+                    # the child replaces the worse of its parents
+                    worse = a if conflicts[a] >= conflicts[b] else b
+                    population[worse], conflicts[worse] = child, child_conflicts
+
+            if conflicts.min() > 0:
+                break
+            best = population[np.argmin(conflicts)].copy()
+            seconds = round(time.time() - start, 2)
+            history.append((seconds, k))
+            print('hea', k, 'colors after', seconds, 's')
+            k -= 1
+
+    return best.astype(np.int64).tolist(), history
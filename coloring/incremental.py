@@ -0,0 +1,229 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import random
+from collections import deque
+
+from graph import build_graph
+from greedy import greedy_coloring, color_count
+from tabucol import decreasing_k_tabucol
+
+# a kempe chain swap is given up once the chain grows past this many nodes
+KEMPE_MAX_CHAIN = 64
+# the local tabu search recolors at most this many nodes around the conflict
+TABU_MAX_NODES = 128
+TABU_ITERATIONS = 500
+# time cap of the full tabucol run when a repair had to open a new color
+RESOLVE_TIME_LIMIT = 1.0
+
+
+class IncrementalColorer(object):
+    '''
+    Keeps a valid coloring of a graph that changes a few edges at a time.
+    A conflict from a new edge is repaired around its endpoints: first with a
+    free color, then with a kempe chain swap, then with a tabu search on the
+    nodes near it. Only when all of these fail is a new color opened and the
+    whole graph recolored.
+    '''
+
+    def __init__(self, node_count=0, edges=(), colors=None):
+        self.adjacency = [set() for _ in range(node_count)]
+        for u, v in edges:
+            if u != v:
+                self.adjacency[u].add(v)
+                self.adjacency[v].add(u)
+        if colors is None:
+            colors = greedy_coloring(build_graph(node_count, self.edges())) if node_count else []
+        self.colors = list(colors)
+        self.class_size = [0]*color_count(self.colors)
+        for color in self.colors:
+            self.class_size[color] += 1
+        self.resolves = 0
+
+    def color_count(self):
+        return len(self.class_size)
+
+    def edges(self):
+        return [(u, v) for u in range(len(self.adjacency)) for v in self.adjacency[u] if u < v]
+
+    def set_color(self, node, color):
+        old = self.colors[node]
+        if old >= 0:
+            self.class_size[old] -= 1
+        if color >= len(self.class_size):
+            self.class_size.extend([0]*(color + 1 - len(self.class_size)))
+        self.colors[node] = color
+        if color >= 0:
+            self.class_size[color] += 1
+        while self.class_size and self.class_size[-1] == 0:
+            self.class_size.pop()
+
+    def add_node(self, neighbours=()):
+        # returns the new node
+        node = len(self.adjacency)
+        self.adjacency.append(set())
+        self.colors.append(-1)
+        for neighbour in neighbours:
+            self.adjacency[node].add(neighbour)
+            self.adjacency[neighbour].add(node)
+        self.repair(node)
+        return node
+
+    def add_edge(self, u, v):
+        if u == v or v in self.adjacency[u]:
+            return
+        self.adjacency[u].add(v)
+        self.adjacency[v].add(u)
+        if self.colors[u] == self.colors[v]:
+            # the endpoint with fewer neighbours is the easier one to move
+            self.repair(u if len(self.adjacency[u]) <= len(self.adjacency[v]) else v)
+
+    def remove_edge(self, u, v):
+        # never creates a conflict; an endpoint in the top color class tries to
+        # move down so the count can shrink
+        self.adjacency[u].discard(v)
+        self.adjacency[v].discard(u)
+        top = self.color_count() - 1
+        for node in (u, v):
+            if self.colors[node] == top:
+                free = self.free_colors(node, top)
+                if free:
+                    self.set_color(node, free[0])
+
+    def free_colors(self, node, k):
+        used = set(self.colors[neighbour] for neighbour in self.adjacency[node])
+        return [color for color in range(k) if color not in used]
+
+    def repair(self, node):
+        # gives node a color no neighbour has without opening a new one when possible
+        k = self.color_count()
+        self.set_color(node, -1)
+        k = max(k, self.color_count())
+        if k == 0:
+            # the first node of an empty graph, nothing to swap or search
+            self.set_color(node, 0)
+            return
+        free = self.free_colors(node, k)
+        if free:
+            self.set_color(node, free[0])
+        elif not self.kempe_repair(node, k) and not self.tabu_repair(node, k):
+            self.set_color(node, k)
+            self.resolve()
+
+    def kempe_chain(self, starts, c, d):
+        # the nodes reachable from starts over edges joining colors c and d, or
+        # None when that is more than KEMPE_MAX_CHAIN nodes
+        chain = set(starts)
+        queue = deque(starts)
+        while queue:
+            node = queue.popleft()
+            other = d if self.colors[node] == c else c
+            for neighbour in self.adjacency[node]:
+                if self.colors[neighbour] == other and neighbour not in chain:
+                    chain.add(neighbour)
+                    if len(chain) > KEMPE_MAX_CHAIN:
+                        return None
+                    queue.append(neighbour)
+        return chain
+
+    def kempe_repair(self, node, k):
+        # node is uncolored; looks for colors c, d where swapping c and d on the
+        # chains through node's c neighbours leaves no c neighbour, so node takes c
+        for c in range(k):
+            starts = [neighbour for neighbour in self.adjacency[node] if self.colors[neighbour] == c]
+            for d in range(k):
+                if d == c:
+                    continue
+                chain = self.kempe_chain(starts, c, d)
+                if chain is None:
+                    continue
+                if any(self.colors[neighbour] == d and neighbour in chain
+                       for neighbour in self.adjacency[node]):
+                    continue
+                for member in chain:
+                    self.set_color(member, d if self.colors[member] == c else c)
+                self.set_color(node, c)
+                return True
+        return False
+
+    def tabu_repair(self, node, k):
+        # tabucol restricted to the nodes closest to node (breadth first, at
+        # most TABU_MAX_NODES) with every other color fixed; the local colors
+        # are restored when no conflict free k-coloring is found
+        local = [node]
+        seen = {node}
+        for member in local:
+            for neighbour in self.adjacency[member]:
+                if neighbour not in seen and len(local) < TABU_MAX_NODES:
+                    seen.add(neighbour)
+                    local.append(neighbour)
+        saved = [self.colors[member] for member in local]
+
+        # node starts on its least conflicting color
+        counts = [0]*k
+        for neighbour in self.adjacency[node]:
+            counts[self.colors[neighbour]] += 1
+        self.colors[node] = counts.index(min(counts))
+
+        # gamma[member][c]: neighbours of member colored c
+        gamma = {}
+        for member in local:
+            row = [0]*k
+            for neighbour in self.adjacency[member]:
+                row[self.colors[neighbour]] += 1
+            gamma[member] = row
+        tabu_until = {}
+        conflicting = set(member for member in local if gamma[member][self.colors[member]] > 0)
+        for iteration in range(TABU_ITERATIONS):
+            if not conflicting:
+                break
+            best_delta, moves = None, []
+            for member in conflicting:
+                own = gamma[member][self.colors[member]]
+                for color in range(k):
+                    if color == self.colors[member] or tabu_until.get((member, color), -1) > iteration:
+                        continue
+                    delta = gamma[member][color] - own
+                    if best_delta is None or delta < best_delta:
+                        best_delta, moves = delta, [(member, color)]
+                    elif delta == best_delta:
+                        moves.append((member, color))
+            if not moves:
+                continue
+            member, color = random.choice(moves)
+            old = self.colors[member]
+            self.colors[member] = color
+            tabu_until[(member, old)] = iteration + random.randint(0, 9) + len(conflicting)//2
+            for neighbour in self.adjacency[member]:
+                if neighbour in gamma:
+                    gamma[neighbour][old] -= 1
+                    gamma[neighbour][color] += 1
+            for changed in [member] + list(self.adjacency[member]):
+                if changed in gamma:
+                    if gamma[changed][self.colors[changed]] > 0:
+                        conflicting.add(changed)
+                    else:
+                        conflicting.discard(changed)
+
+        if conflicting:
+            for member, color in zip(local, saved):
+                self.colors[member] = color
+            return False
+        new_colors = [self.colors[member] for member in local]
+        for member, color in zip(local, saved):
+            self.colors[member] = color
+        for member, color in zip(local, new_colors):
+            self.set_color(member, color)
+        return True
+
+    def resolve(self):
+        # a repair had to open a new color: tabucol on the whole graph tries to
+        # drop colors again, starting from the current coloring
+        self.resolves += 1
+        graph = build_graph(len(self.adjacency), self.edges())
+        colors, _ = decreasing_k_tabucol(graph, self.colors, time_limit=RESOLVE_TIME_LIMIT)
+        if color_count(colors) < self.color_count():
+            self.colors = list(colors)
+            self.class_size = [0]*color_count(self.colors)
+            for color in self.colors:
+                self.class_size[color] += 1
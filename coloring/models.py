@@ -0,0 +1,139 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import resource
+import time
+
+from ortools.sat.python import cp_model
+
+from clique import edge_clique_cover
+from greedy import color_count
+
+# 'auto' picks the boolean formulation up to this edge density and this many
+# x[v][c] variables, the integer one otherwise
+BOOLEAN_MAX_DENSITY = 0.2
+BOOLEAN_MAX_VARIABLES = 20000
+
+
+def build_k_coloring_model(graph, k, hint, clique, cover):
+    # feasibility of coloring with k colors: one integer color per node below
+    # k, all different over each clique of an edge clique cover (!= for plain
+    # edges), clique node i fixed to color i and hint as the starting point
+    # returns (cpmodel, node_color_cp)
+    node_count = graph.node_count
+    cpmodel = cp_model.CpModel()
+    node_color_cp = [cpmodel.NewIntVar(0, k - 1, 'node_{}'.format(node))
+              for node in range(node_count)]
+    for i, node in enumerate(clique):
+        cpmodel.Add(node_color_cp[node] == i)
+
+    # start the search from the hint when this or-tools has hints
+    if hasattr(cpmodel, 'AddHint'):
+        for node in range(node_count):
+            cpmodel.AddHint(node_color_cp[node], hint[node])
+
+    # make the edge constraints
+    for nodes in cover:
+        if len(nodes) == 2:
+            cpmodel.Add(node_color_cp[nodes[0]] != node_color_cp[nodes[1]])
+        else:
+            cpmodel.AddAllDifferent([node_color_cp[node] for node in nodes])
+    return cpmodel, node_color_cp
+
+
+def build_integer_model(graph, greedy_colors, clique, lower_bound, cover=None):
+    # the k coloring model below the greedy count with n_colors_used as the
+    # largest color to minimise
+    # returns (cpmodel, node_color_cp, n_colors_used)
+    upper_bound = color_count(greedy_colors)
+    if cover is None:
+        cover = edge_clique_cover(graph)
+
+    cpmodel, node_color_cp = build_k_coloring_model(graph, upper_bound, greedy_colors, clique, cover)
+    n_colors_used = cpmodel.NewIntVar(max(lower_bound - 1, 0), upper_bound - 1, 'n_cols')
+    if hasattr(cpmodel, 'AddHint'):
+        cpmodel.AddHint(n_colors_used, upper_bound - 1)
+
+    # n_colors is the largest color
+    cpmodel.AddMaxEquality(n_colors_used, node_color_cp)
+
+    cpmodel.Minimize(n_colors_used)
+    return cpmodel, node_color_cp, n_colors_used
+
+
+def build_boolean_model(graph, greedy_colors, clique, lower_bound, cover=None):
+    # x[v][c] is node v taking color c for c below the greedy count, used[c]
+    # is color c being open; each clique of an edge clique cover takes a color
+    # at most once and only when it is open, open colors come first
+    # returns (cpmodel, node color expressions, number of colors used)
+    node_count = graph.node_count
+    upper_bound = color_count(greedy_colors)
+    if cover is None:
+        cover = edge_clique_cover(graph)
+
+    cpmodel = cp_model.CpModel()
+    x = [[cpmodel.NewBoolVar('x_{}_{}'.format(node, color)) for color in range(upper_bound)]
+         for node in range(node_count)]
+    used = [cpmodel.NewBoolVar('used_{}'.format(color)) for color in range(upper_bound)]
+
+    for node in range(node_count):
+        cpmodel.Add(sum(x[node]) == 1)
+    for nodes in cover:
+        for color in range(upper_bound):
+            cpmodel.Add(sum(x[node][color] for node in nodes) <= used[color])
+    # isolated nodes are in no clique of the cover
+    for node in range(node_count):
+        if graph.degree[node] == 0:
+            for color in range(upper_bound):
+                cpmodel.Add(x[node][color] <= used[color])
+
+    for color in range(upper_bound - 1):
+        cpmodel.Add(used[color] >= used[color + 1])
+    for color in range(min(lower_bound, upper_bound)):
+        cpmodel.Add(used[color] == 1)
+    for i, node in enumerate(clique):
+        cpmodel.Add(x[node][i] == 1)
+
+    if hasattr(cpmodel, 'AddHint'):
+        for node in range(node_count):
+            for color in range(upper_bound):
+                cpmodel.AddHint(x[node][color], int(greedy_colors[node] == color))
+        for color in range(upper_bound):
+            cpmodel.AddHint(used[color], 1)
+
+    n_colors_used = sum(used)
+    cpmodel.Minimize(n_colors_used)
+    node_color_cp = [sum(color*x[node][color] for color in range(upper_bound))
+                     for node in range(node_count)]
+    return cpmodel, node_color_cp, n_colors_used
+
+
+MODEL_BUILDERS = {
+    'integer': build_integer_model,
+    'boolean': build_boolean_model,
+}
+
+
+def edge_density(graph):
+    node_count = graph.node_count
+    if node_count < 2:
+        return 0.0
+    return graph.degree.sum()/float(node_count*(node_count - 1))
+
+
+def build_model(graph, greedy_colors, clique, lower_bound, formulation='auto'):
+    # builds the named formulation ('auto' chooses by edge density) and prints
+    # its build time, size and peak memory growth; returns what the builder returns
+    if formulation == 'auto':
+        small = graph.node_count*color_count(greedy_colors) <= BOOLEAN_MAX_VARIABLES
+        formulation = 'boolean' if small and edge_density(graph) <= BOOLEAN_MAX_DENSITY else 'integer'
+    start = time.time()
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    cover = edge_clique_cover(graph)
+    model = MODEL_BUILDERS[formulation](graph, greedy_colors, clique, lower_bound, cover)
+    proto = model[0].Proto() if hasattr(model[0], 'Proto') else model[0].ModelProto()
+    print('model', formulation, 'cover cliques', len(cover),
+          'variables', len(proto.variables), 'constraints', len(proto.constraints),
+          'build seconds', round(time.time() - start, 2),
+          'peak memory growth MB', (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - peak_kb)//1024)
+    return model
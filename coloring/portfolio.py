@@ -0,0 +1,154 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# races CP-SAT, dsatur + tabucol and the exact dsatur branch and bound in
+# separate processes; the best color count and coloring live in shared memory
+# so every worker aims below it, and the race stops as soon as one worker
+# proves optimality (or the clique bound is met)
+
+import multiprocessing
+import time
+
+import numpy as np
+
+from greedy import color_count
+from tabucol import neighbour_arrays, tabucol
+from dsatur_bnb import dsatur_bnb
+
+
+def publish(colors, lower_bound, best, best_colors, proven):
+    # shares a coloring when it beats the best count; the count and the
+    # coloring change under the same lock so the parent never sees one
+    # without the other
+    count = color_count(colors)
+    with best.get_lock():
+        if count >= best.value:
+            return
+        best.value = count
+        best_colors[:] = list(colors)
+    if count <= lower_bound:
+        proven.set()
+
+
+def cp_sat_worker(graph, colors, clique, lower_bound, time_limit, search_workers, formulation,
+                  best, best_colors, proven, slice_seconds=10.0):
+    # CP-SAT in time slices; before every slice the colors are bounded to stay
+    # below the shared best, so a slice proving optimal or infeasible proves
+    # the shared best optimal. when nobody lowered the best during a slice the
+    # next one is twice as long, as it restarts on the same model
+    from ortools.sat.python import cp_model
+    from models import build_model
+
+    start = time.time()
+    cpmodel, node_color_cp, n_colors_used = build_model(graph, colors, clique, lower_bound, formulation)
+
+    class Publisher(cp_model.CpSolverSolutionCallback):
+        def __init__(self):
+            cp_model.CpSolverSolutionCallback.__init__(self)
+
+        def on_solution_callback(self):
+            publish([self.Value(v) for v in node_color_cp], lower_bound, best, best_colors, proven)
+            if proven.is_set() and hasattr(self, 'StopSearch'):
+                self.StopSearch()
+
+    bound = color_count(colors)
+    while not proven.is_set():
+        remaining = time_limit - (time.time() - start)
+        if remaining <= 0:
+            return
+        if best.value < bound:
+            bound = best.value
+            # labels up to bound - 2 is fewer than bound colors in either formulation
+            for node_color in node_color_cp:
+                cpmodel.Add(node_color <= bound - 2)
+        if bound <= max(lower_bound, 1):
+            return
+
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = min(slice_seconds, remaining)
+        solver.parameters.num_search_workers = search_workers
+        if hasattr(solver, 'SolveWithSolutionCallback'):
+            status = solver.SolveWithSolutionCallback(cpmodel, Publisher())
+        else:
+            status = solver.Solve(cpmodel, Publisher())
+        if status in (cp_model.OPTIMAL, cp_model.INFEASIBLE):
+            proven.set()
+        elif best.value == bound:
+            slice_seconds *= 2
+
+
+def tabu_worker(graph, colors, lower_bound, time_limit, best, best_colors, proven, slice_seconds=1.0):
+    # tabucol in short slices; before every slice k is tightened to one below
+    # the shared best, the nodes above it are moved to random lower colors
+    start = time.time()
+    neighbours = neighbour_arrays(graph)
+    current = np.array(colors, dtype=np.int64)
+    k = color_count(current)
+    solved = True
+    while not proven.is_set():
+        remaining = time_limit - (time.time() - start)
+        # after a failed slice keep working on the same k unless someone beat it
+        target = min(best.value - 1, k - 1 if solved else k)
+        if remaining <= 0 or target < max(lower_bound, 1):
+            return
+        if target < k:
+            top = current >= target
+            current[top] = np.random.randint(target, size=int(top.sum()))
+            k = target
+        current, conflicts = tabucol(neighbours, current, k, time_limit=min(slice_seconds, remaining))
+        solved = conflicts == 0
+        if solved:
+            publish(current.tolist(), lower_bound, best, best_colors, proven)
+
+
+def bnb_worker(graph, colors, lower_bound, time_limit, best, best_colors, proven):
+    def on_improve(colors):
+        publish(colors, lower_bound, best, best_colors, proven)
+
+    _, complete, _ = dsatur_bnb(graph, colors, lower_bound, time_limit, best, on_improve)
+    if complete:
+        proven.set()
+
+
+def run_portfolio(graph, colors, clique, lower_bound, time_limit=600.0, search_workers=None,
+                  formulation='auto'):
+    # returns (best colors, proven)
+    if search_workers is None:
+        search_workers = max(multiprocessing.cpu_count() - 2, 1)
+    best = multiprocessing.Value('i', color_count(colors))
+    # guarded by best's lock rather than one of its own
+    best_colors = multiprocessing.Array('i', list(colors), lock=False)
+    proven = multiprocessing.Event()
+
+    workers = [
+        multiprocessing.Process(target=cp_sat_worker, args=(graph, colors, clique, lower_bound, time_limit,
+                                                            search_workers, formulation,
+                                                            best, best_colors, proven)),
+        multiprocessing.Process(target=tabu_worker, args=(graph, colors, lower_bound, time_limit,
+                                                          best, best_colors, proven)),
+        multiprocessing.Process(target=bnb_worker, args=(graph, colors, lower_bound, time_limit,
+                                                         best, best_colors, proven)),
+    ]
+    for worker in workers:
+        worker.daemon = True
+        worker.start()
+
+    start = time.time()
+    while not proven.is_set() and time.time() - start < time_limit:
+        if not any(worker.is_alive() for worker in workers):
+            break
+        proven.wait(0.5)
+
+    # workers are only killed while the lock is held, so none of them dies
+    # halfway through publishing and leaves the lock taken or the coloring torn.
+    # the event is read before any kill and never after: a worker killed inside
+    # is_set() or set() would leave the event's own lock taken
+    with best.get_lock():
+        is_proven = proven.is_set() or best.value <= lower_bound
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+        for worker in workers:
+            worker.join()
+        colors = list(best_colors)
+    return colors, is_proven
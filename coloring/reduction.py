@@ -0,0 +1,119 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from collections import namedtuple
+
+import numpy as np
+
+from graph import build_graph, edge_array, neighbour_lists
+
+# the dominance test multiplies dense adjacency matrices, skip it above this many nodes
+DOMINANCE_MAX_NODES = 5000
+
+# removed lists (node, dominator) in removal order, dominator is -1 for peeled nodes
+Reduction = namedtuple("Reduction", ['kernel', 'removed'])
+
+
+def peel(degree, adjacency, alive, threshold, removed):
+    # removes nodes with fewer than threshold live neighbours, repeatedly; any
+    # coloring with at least threshold colors extends to them afterwards
+    stack = [node for node in np.flatnonzero(alive & (degree < threshold)).tolist()]
+    while stack:
+        node = stack.pop()
+        if not alive[node]:
+            continue
+        alive[node] = False
+        removed.append((node, -1))
+        for neighbour in adjacency[node]:
+            if alive[neighbour]:
+                degree[neighbour] -= 1
+                if degree[neighbour] == threshold - 1:
+                    stack.append(neighbour)
+
+
+def remove_dominated(graph, alive, degree, removed):
+    # u is dominated by a non adjacent v when every live neighbour of u is also a
+    # neighbour of v: u can always take v's color. common[u, v] counts shared
+    # live neighbours so domination is common[u, v] == degree[u]
+    nodes = np.flatnonzero(alive)
+    if len(nodes) == 0 or graph.node_count > DOMINANCE_MAX_NODES:
+        return 0
+    matrix = np.zeros((graph.node_count, graph.node_count), dtype=np.float32)
+    matrix[np.repeat(np.arange(graph.node_count), graph.degree), graph.indices] = 1
+    live = matrix[np.ix_(nodes, nodes)]
+    common = live.dot(live)
+    dominated = (common == degree[nodes][:, None]) & (live == 0)
+    np.fill_diagonal(dominated, False)
+
+    count = 0
+    gone = np.zeros(len(nodes), dtype=bool)
+    for u in range(len(nodes)):
+        # the dominator has to stay in the graph, and of two nodes with the same
+        # neighbourhood only one may go
+        candidates = np.flatnonzero(dominated[u] & ~gone)
+        if len(candidates):
+            gone[u] = True
+            alive[nodes[u]] = False
+            removed.append((int(nodes[u]), int(nodes[candidates[0]])))
+            count += 1
+    if count:
+        # degrees of the remaining nodes drop by their removed neighbours
+        degree[nodes] -= live[:, gone].sum(axis=1).astype(degree.dtype)
+    return count
+
+
+def reduce_graph(graph, lower_bound, max_rounds=10):
+    # alternates low degree peeling and dominated node removal until neither
+    # changes the graph; returns the kernel nodes and the removal order
+    adjacency = neighbour_lists(graph)
+    degree = graph.degree.copy()
+    alive = np.ones(graph.node_count, dtype=bool)
+    removed = []
+    for _ in range(max_rounds):
+        peel(degree, adjacency, alive, lower_bound, removed)
+        if remove_dominated(graph, alive, degree, removed) == 0:
+            break
+    peel(degree, adjacency, alive, lower_bound, removed)
+    return Reduction(np.flatnonzero(alive), removed)
+
+
+def induced_subgraph(graph, nodes):
+    # graph on nodes relabelled 0..len(nodes)-1 in the given order
+    position = np.full(graph.node_count, -1, dtype=np.int64)
+    position[nodes] = np.arange(len(nodes))
+    edges = edge_array(graph)
+    keep = (position[edges[:, 0]] >= 0) & (position[edges[:, 1]] >= 0)
+    return build_graph(len(nodes), position[edges[keep]])
+
+
+def components(graph):
+    # connected component label per node by min-label propagation with pointer jumping
+    labels = np.arange(graph.node_count)
+    has_neighbours = graph.degree > 0
+    starts = graph.indptr[:-1][has_neighbours]
+    while True:
+        neighbour_min = np.minimum.reduceat(labels[graph.indices], starts) if len(starts) else starts
+        updated = labels.copy()
+        updated[has_neighbours] = np.minimum(labels[has_neighbours], neighbour_min)
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+def reinsert(graph, colors, removed):
+    # colors is a full length array valid on the kernel; removed nodes come back
+    # in reverse order, dominated ones with their dominator's color and peeled
+    # ones with the smallest color free among their already colored neighbours
+    adjacency = neighbour_lists(graph)
+    colors = np.asarray(colors).tolist()
+    for node, dominator in reversed(removed):
+        if dominator >= 0:
+            colors[node] = colors[dominator]
+            continue
+        used = set(colors[neighbour] for neighbour in adjacency[node] if colors[neighbour] >= 0)
+        color = 0
+        while color in used:
+            color += 1
+        colors[node] = color
+    return colors
@@ -1,68 +1,78 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from instance_parser import parse_coloring
+
+import numpy as np
+
 from ortools.sat.python import cp_model
-import networkx as nx
+from graph import build_graph
+from models import build_model
+from reduction import reduce_graph, induced_subgraph, components, reinsert
+from greedy import greedy_coloring, color_count
+from clique import max_clique
+from tabucol import decreasing_k_tabucol
+from portfolio import run_portfolio
+from decreasing_k import decreasing_k
+from hea import hea
 from collections import Counter
 from ortools.linear_solver import pywraplp
 
-
-
-
-
-def solve_it(input_data):
-    # Modify this code to run your optimization algorithm
-
-    print('\n')
-
-    # parse the input
-    lines = input_data.split('\n')
-
-    first_line = lines[0].split()
-    node_count = int(first_line[0])
-    edge_count = int(first_line[1])
-    print('node_cunt', node_count)
-    print('edget cunt', edge_count)
-    edges = []
-    for i in range(1, edge_count + 1):
-        line = lines[i]
-        parts = line.split()
-        edges.append((int(parts[0]), int(parts[1])))
+# time cap of the max clique heuristic giving the lower bound
+CLIQUE_TIME_LIMIT = 10.0
+# 'cp_sat' minimises the colors with the CP model, 'tabucol' runs tabu search
+# on decreasing k from the greedy coloring, 'portfolio' races CP-SAT, tabucol
+# and exact dsatur branch and bound in parallel processes, 'decreasing_k' asks
+# for feasible colorings with k = UB-1, UB-2, ... one short run at a time,
+# 'hea' evolves a population of colorings with gpx crossover and tabucol
+ENGINE = 'cp_sat'
+TABUCOL_TIME_LIMIT = 600.0
+# 'cp_sat' or 'tabucol' feasibility runs, each capped at the step limit
+DECREASING_K_STEP = 'cp_sat'
+DECREASING_K_STEP_TIME_LIMIT = 60.0
+DECREASING_K_TIME_LIMIT = 600.0
+DECREASING_K_CP_WORKERS = 8
+HEA_TIME_LIMIT = 600.0
+HEA_POPULATION = 10
+HEA_TABU_ITERATIONS = 2000
+# processes breeding children, None uses every core
+HEA_WORKERS = None
+PORTFOLIO_TIME_LIMIT = 600.0
+# CP-SAT search workers inside the portfolio, None leaves two cores to the heuristics
+PORTFOLIO_CP_WORKERS = None
+# CP formulation: 'integer', 'boolean' or 'auto' to choose by edge density
+CP_MODEL = 'auto'
+# peel low degree and dominated nodes and split components before the engine runs
+REDUCE_GRAPH = True
+
+
+def relabel_colors(colors, clique):
+    # permutes the color labels so that clique node i has color i
+    count = color_count(colors)
+    relabel = {colors[node]: i for i, node in enumerate(clique)}
+    free_labels = iter(range(len(clique), count))
+    for color in range(count):
+        if color not in relabel:
+            relabel[color] = next(free_labels)
+    return [relabel[color] for color in colors]
+
+
+def solve_with_tabucol(graph, colors, clique, lower_bound):
+    colors, stats = decreasing_k_tabucol(graph, colors, lower_bound, TABUCOL_TIME_LIMIT)
+    print('tabucol iterations', stats['iterations'],
+          'iterations per second', int(stats['iterations_per_second']))
+    return colors, False
+
+
+def solve_with_cp_sat(graph, greedy_colors, clique, lower_bound):
+    node_count = graph.node_count
 
     # build a solution with CP MODEL
-    cpmodel = cp_model.CpModel()
-    n_colors_used = cpmodel.NewIntVar(0, node_count, 'n_cols')
-    node_color_cp = [cpmodel.NewIntVar(0, node, 'node_{}'.format(node))
-              for node in range(node_count)]
-
-    # make the edge constraints
-    G = nx.Graph()
-    for edge in edges:
-        ni = edge[0]
-        nj = edge[1]
-        G.add_edge(ni, nj)
-        cpmodel.Add(node_color_cp[ni]!=node_color_cp[nj])
-
-    # every color has to be lower than n_colors
-    for node_idx in range(node_count):
-        cpmodel.Add(node_color_cp[node_idx] <= n_colors_used)
-
-
-
-    #cliques = list(nx.algorithms.clique.find_cliques(G))
-    #print('len_cliques', len(cliques))
-    #clique_len = list(map(len, cliques))
-    #max_len = max(clique_len)
-    #print('max_len', max_len)
-    #reduced_cliques = [clique for clique in cliques if len(clique)>=max_len-20]
-    #print('len_reduced_cliques', len(reduced_cliques))
-    #print('done with clique finding')
-    #for clique in cliques:
-    #    cpmodel.AddAllDifferent([node_color_cp[i] for i in clique])
-
-
-    ## DEFine AUX VAR That IS NUMBER OF COLORS
-
+    cpmodel, node_color_cp, n_colors_used = build_model(graph, greedy_colors, clique,
+                                                        lower_bound, CP_MODEL)
 
     print('done adding constraints')
     solver = cp_model.CpSolver()
@@ -70,19 +80,132 @@ def solve_it(input_data):
 
 
     obj_fun = n_colors_used
-    cpmodel.Minimize(obj_fun)
 
     print('about to solve')
     status = solver.Solve(cpmodel)
     print('status', status)
     print('cp_model.OPTIMAL', cp_model.OPTIMAL)
     print('solved')
-    solution_node_colors = [solver.Value(node_color_cp[i]) for i in range(node_count)]
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        print('obj_fun', obj_fun)
+        print('obj value', solver.ObjectiveValue())
+        return [solver.Value(node_color_cp[i]) for i in range(node_count)], status == cp_model.OPTIMAL
+    # no model solution in the time limit, the greedy coloring is still valid
+    return greedy_colors, False
+
+
+def solve_with_portfolio(graph, colors, clique, lower_bound):
+    colors, proven = run_portfolio(graph, colors, clique, lower_bound,
+                                   PORTFOLIO_TIME_LIMIT, PORTFOLIO_CP_WORKERS, CP_MODEL)
+    print('portfolio colors', color_count(colors), 'proven', proven)
+    return colors, proven
+
+
+def solve_with_decreasing_k(graph, colors, clique, lower_bound):
+    colors, proven = decreasing_k(graph, colors, clique, lower_bound, DECREASING_K_STEP,
+                                  DECREASING_K_STEP_TIME_LIMIT, DECREASING_K_TIME_LIMIT,
+                                  DECREASING_K_CP_WORKERS)
+    print('decreasing k colors', color_count(colors), 'proven', proven)
+    return colors, proven
+
+
+def solve_with_hea(graph, colors, clique, lower_bound):
+    colors, history = hea(graph, colors, lower_bound, HEA_POPULATION, HEA_TABU_ITERATIONS,
+                          HEA_TIME_LIMIT, HEA_WORKERS)
+    print('hea best colors over time', history)
+    return colors, False
+
+
+# engines take (graph, greedy colors, clique, lower bound) and return
+# (colors, proven) where proven means no coloring with fewer colors exists
+ENGINES = {
+    'cp_sat': solve_with_cp_sat,
+    'tabucol': solve_with_tabucol,
+    'portfolio': solve_with_portfolio,
+    'decreasing_k': solve_with_decreasing_k,
+    'hea': solve_with_hea,
+}
+
+
+def solve_graph(graph, greedy_colors, clique, lower_bound):
+    # runs the engine unless the greedy coloring already meets the clique bound
+    # returns (colors, proven)
+    greedy_colors = relabel_colors(greedy_colors, clique)
+    if color_count(greedy_colors) <= lower_bound:
+        return greedy_colors, True
+    colors, proven = ENGINES[ENGINE](graph, greedy_colors, clique, lower_bound)
+    return colors, proven or color_count(colors) <= lower_bound
+
+
+def solve_reduced(graph, greedy_colors, clique, lower_bound):
+    # colors the kernel left by peeling and domination one component at a
+    # time, then puts the removed nodes back; returns (colors, proven) where a
+    # component proven optimal bounds the whole graph from below like the clique
+    reduction = reduce_graph(graph, lower_bound)
+    kernel = reduction.kernel
+    print('kernel nodes', len(kernel), 'of', graph.node_count)
+
+    colors = np.full(graph.node_count, -1, dtype=np.int64)
+    proven_bound = lower_bound
+    if len(kernel):
+        kernel_graph = induced_subgraph(graph, kernel)
+        labels = components(kernel_graph)
+        for label in np.unique(labels).tolist():
+            members = kernel[labels == label]
+            print('component of', len(members), 'nodes')
+            component = induced_subgraph(graph, members)
+            local = np.full(graph.node_count, -1, dtype=np.int64)
+            local[members] = np.arange(len(members))
+            component_clique = [int(local[node]) for node in clique if local[node] >= 0]
+
+            # the better of a fresh greedy and the full graph greedy restricted to it
+            component_colors = greedy_coloring(component)
+            restricted = np.unique(np.asarray(greedy_colors)[members], return_inverse=True)[1].tolist()
+            if color_count(restricted) < color_count(component_colors):
+                component_colors = restricted
+            component_colors, proven = solve_graph(component, component_colors, component_clique, lower_bound)
+            colors[members] = component_colors
+            if proven:
+                proven_bound = max(proven_bound, color_count(component_colors))
+
+    colors = reinsert(graph, colors, reduction.removed)
+    return colors, color_count(colors) <= proven_bound
+
+
+def solve_it(input_data):
+    # Modify this code to run your optimization algorithm
+
+    print('\n')
+
+    # parse the input
+    instance = parse_coloring(input_data)
+    node_count = instance.node_count
+    edge_count = len(instance.edges)
+    print('node_cunt', node_count)
+    print('edget cunt', edge_count)
+    graph = build_graph(node_count, instance.edges)
+
+    # a greedy coloring bounds the number of colors the model has to consider
+    greedy_colors = greedy_coloring(graph)
+    upper_bound = color_count(greedy_colors)
+    print('greedy colors', upper_bound)
+
+    # a clique needs as many colors as it has nodes: lower bound and symmetry breaking
+    clique = max_clique(graph,
+                        time_limit=CLIQUE_TIME_LIMIT, target=upper_bound)
+    lower_bound = len(clique)
+    print('clique lower bound', lower_bound)
+
+    if lower_bound == upper_bound:
+        print('greedy coloring matches the clique bound, optimal')
+        solution_node_colors, proven = greedy_colors, True
+    elif REDUCE_GRAPH:
+        solution_node_colors, proven = solve_reduced(graph, greedy_colors, clique, lower_bound)
+    else:
+        solution_node_colors, proven = solve_graph(graph, greedy_colors, clique, lower_bound)
 
-    print('obj_fun', obj_fun)
-    print('obj value', solver.ObjectiveValue())
     # prepare the solution in the specified output format
-    output_data = str(solver.Value(n_colors_used)) + ' ' + str(0) + '\n'
+    output_data = str(color_count(solution_node_colors)) + ' ' + str(int(proven)) + '\n'
     output_data += ' '.join(map(str, solution_node_colors))
 
 
@@ -0,0 +1,108 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import time
+
+import numpy as np
+
+from graph import neighbours as graph_neighbours
+
+
+def neighbour_arrays(graph):
+    # views into the csr indices, which hold every neighbour once so the fancy
+    # indexed updates of gamma stay exact
+    return [graph_neighbours(graph, node) for node in range(graph.node_count)]
+
+
+def conflict_table(neighbours, colors, k):
+    # gamma[v, c] is the number of neighbours of v colored c
+    gamma = np.zeros((len(neighbours), k), dtype=np.int32)
+    for node, nodes in enumerate(neighbours):
+        if len(nodes):
+            gamma[node] = np.bincount(colors[nodes], minlength=k)[:k]
+    return gamma
+
+
+def tabucol(neighbours, colors, k, max_iterations=100000, time_limit=None, stats=None):
+    # minimises the conflicting edges of a k-coloring by moving one conflicting
+    # node to another color per iteration; the reverse move is tabu for
+    # L + 0.6 * (conflicting nodes) iterations unless it beats the best seen
+    # returns (colors, conflicts) of the best coloring found
+    node_count = len(neighbours)
+    start = time.time()
+    colors = np.array(colors, dtype=np.int64)
+    gamma = conflict_table(neighbours, colors, k)
+    rows = np.arange(node_count)
+    tabu_until = np.zeros((node_count, k), dtype=np.int64)
+
+    conflicts = int(gamma[rows, colors].sum()) // 2
+    best_conflicts, best_colors = conflicts, colors.copy()
+    iteration = 0
+    while conflicts > 0 and iteration < max_iterations:
+        if time_limit is not None and iteration % 100 == 0 and time.time() - start > time_limit:
+            break
+        iteration += 1
+
+        conflicting = np.flatnonzero(gamma[rows, colors] > 0)
+        own = gamma[conflicting, colors[conflicting]]
+        delta = gamma[conflicting].astype(np.int64) - own[:, None]
+        delta[np.arange(len(conflicting)), colors[conflicting]] = node_count
+        # aspiration: a tabu move is allowed when it leads below the best so far
+        forbidden = (tabu_until[conflicting] > iteration) & (conflicts + delta >= best_conflicts)
+        delta[forbidden] = node_count
+
+        best_delta = delta.min()
+        if best_delta >= node_count:
+            continue
+        choices = np.flatnonzero(delta.ravel() == best_delta)
+        choice = choices[np.random.randint(len(choices))]
+        node = conflicting[choice // k]
+        new_color = choice % k
+        old_color = colors[node]
+
+        # O(degree) update of the table
+        nodes = neighbours[node]
+        gamma[nodes, old_color] -= 1
+        gamma[nodes, new_color] += 1
+        colors[node] = new_color
+        conflicts += int(best_delta)
+        tabu_until[node, old_color] = iteration + np.random.randint(10) + int(0.6*len(conflicting))
+
+        if conflicts < best_conflicts:
+            best_conflicts, best_colors = conflicts, colors.copy()
+
+    if stats is not None:
+        stats['iterations'] = stats.get('iterations', 0) + iteration
+        stats['seconds'] = stats.get('seconds', 0.0) + time.time() - start
+    return best_colors, best_conflicts
+
+
+def decreasing_k_tabucol(graph, colors, lower_bound=0, time_limit=60.0,
+                         max_iterations=100000):
+    # starting from a valid coloring, drops the highest color (its nodes move to
+    # a random lower color) and repairs with tabucol until a k fails or the time
+    # limit or the lower bound is reached; returns (best valid colors, stats)
+    # where stats counts iterations and iterations per second
+    start = time.time()
+    neighbours = neighbour_arrays(graph)
+    best = np.array(colors, dtype=np.int64)
+    stats = {'iterations': 0, 'seconds': 0.0}
+    k = int(best.max()) + 1 if len(best) else 0
+
+    while k - 1 >= max(lower_bound, 1):
+        remaining = time_limit - (time.time() - start)
+        if remaining <= 0:
+            break
+        candidate = best.copy()
+        top = candidate == k - 1
+        candidate[top] = np.random.randint(k - 1, size=int(top.sum()))
+        candidate, conflicts = tabucol(neighbours, candidate, k - 1, max_iterations,
+                                       remaining, stats)
+        if conflicts > 0:
+            break
+        best = candidate
+        k -= 1
+        print('tabucol', k, 'colors after', round(time.time() - start, 2), 's')
+
+    stats['iterations_per_second'] = stats['iterations'] / max(stats['seconds'], 1e-9)
+    return best.tolist(), stats
@@ -3,6 +3,11 @@
 
 from collections import namedtuple
 import math
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from instance_parser import parse_facility
+
 from ortools.linear_solver import pywraplp
 from ortools.constraint_solver import pywrapcp
 
@@ -17,21 +22,16 @@ def solve_it(input_data):
     # Modify this code to run your optimization algorithm
 
     # parse the input
-    lines = input_data.split('\n')
-
-    parts = lines[0].split()
-    facility_count = int(parts[0])
-    customer_count = int(parts[1])
-    
-    facilities = []
-    for i in range(1, facility_count+1):
-        parts = lines[i].split()
-        facilities.append(Facility(i-1, float(parts[0]), int(parts[1]), Point(float(parts[2]), float(parts[3]))))
-
-    customers = []
-    for i in range(facility_count+1, facility_count+1+customer_count):
-        parts = lines[i].split()
-        customers.append(Customer(i-1-facility_count, int(parts[0]), Point(float(parts[1]), float(parts[2]))))
+    instance = parse_facility(input_data)
+    facility_count = len(instance.setup_costs)
+    customer_count = len(instance.demands)
+
+    facilities = [Facility(i, setup_cost, capacity, Point(x, y)) for i, (setup_cost, capacity, (x, y))
+                  in enumerate(zip(instance.setup_costs.tolist(), instance.capacities.tolist(),
+                                   instance.facility_coordinates.tolist()))]
+
+    customers = [Customer(i, demand, Point(x, y)) for i, (demand, (x, y))
+                 in enumerate(zip(instance.demands.tolist(), instance.customer_coordinates.tolist()))]
 
     demand_vector = [c.demand for c in customers]
     capacity_vector = [f.capacity for f in facilities]
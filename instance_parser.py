@@ -0,0 +1,107 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# bulk parsers for the instance files of every problem
+# the whole text is tokenised by numpy in one call and sliced into typed arrays
+# instead of splitting it line by line and calling int() per token
+
+from collections import namedtuple
+
+import numpy as np
+
+KnapsackInstance = namedtuple("KnapsackInstance", ['capacity', 'values', 'weights'])
+MultiKnapsackInstance = namedtuple("MultiKnapsackInstance", ['capacities', 'values', 'weights'])
+ColoringInstance = namedtuple("ColoringInstance", ['node_count', 'edges'])
+TspInstance = namedtuple("TspInstance", ['coordinates'])
+FacilityInstance = namedtuple("FacilityInstance", ['setup_costs', 'capacities', 'facility_coordinates',
+                                                   'demands', 'customer_coordinates'])
+VrpInstance = namedtuple("VrpInstance", ['vehicle_count', 'vehicle_capacity', 'demands', 'coordinates'])
+SetCoverInstance = namedtuple("SetCoverInstance", ['item_count', 'costs', 'sets'])
+
+
+def tokens(input_data, dtype=np.float64):
+    # whitespace separated numbers (newlines included) straight into an array
+    return np.fromstring(input_data, dtype=dtype, sep=' ')
+
+
+def read_tokens(file_location, dtype=np.float64):
+    # same as tokens() but numpy reads the file itself, no python string in between
+    return np.fromfile(file_location, dtype=dtype, sep=' ')
+
+
+def check_length(data, expected, name):
+    if len(data) < expected:
+        raise ValueError('{} instance truncated: expected {} numbers, got {}'.format(
+            name, expected, len(data)))
+
+
+def parse_knapsack(input_data):
+    data = input_data if isinstance(input_data, np.ndarray) else tokens(input_data, np.int64)
+    item_count = int(data[0])
+    check_length(data, 2 + 2*item_count, 'knapsack')
+    rows = data[2:2 + 2*item_count].reshape(item_count, 2)
+    return KnapsackInstance(int(data[1]), rows[:, 0], rows[:, 1])
+
+
+def knapsack_dimensions(input_data):
+    # the first line is 'n capacity_1 .. capacity_K', item lines are 'v w_1 .. w_K'
+    return len(input_data.partition('\n')[0].split()) - 1
+
+
+def parse_multi_knapsack(input_data):
+    # weights come back as a (K, n) matrix
+    dimensions = knapsack_dimensions(input_data)
+    data = tokens(input_data, np.int64)
+    item_count = int(data[0])
+    start = 1 + dimensions
+    check_length(data, start + (1 + dimensions)*item_count, 'knapsack')
+    rows = data[start:start + (1 + dimensions)*item_count].reshape(item_count, 1 + dimensions)
+    return MultiKnapsackInstance(data[1:start], rows[:, 0], rows[:, 1:].T.copy())
+
+
+def parse_coloring(input_data):
+    data = input_data if isinstance(input_data, np.ndarray) else tokens(input_data, np.int64)
+    edge_count = int(data[1])
+    check_length(data, 2 + 2*edge_count, 'coloring')
+    return ColoringInstance(int(data[0]), data[2:2 + 2*edge_count].reshape(edge_count, 2))
+
+
+def parse_tsp(input_data):
+    data = input_data if isinstance(input_data, np.ndarray) else tokens(input_data)
+    node_count = int(data[0])
+    check_length(data, 1 + 2*node_count, 'tsp')
+    return TspInstance(data[1:1 + 2*node_count].reshape(node_count, 2))
+
+
+def parse_facility(input_data):
+    data = input_data if isinstance(input_data, np.ndarray) else tokens(input_data)
+    facility_count = int(data[0])
+    customer_count = int(data[1])
+    check_length(data, 2 + 4*facility_count + 3*customer_count, 'facility')
+    facilities = data[2:2 + 4*facility_count].reshape(facility_count, 4)
+    start = 2 + 4*facility_count
+    customers = data[start:start + 3*customer_count].reshape(customer_count, 3)
+    return FacilityInstance(facilities[:, 0], facilities[:, 1].astype(np.int64), facilities[:, 2:4],
+                            customers[:, 0].astype(np.int64), customers[:, 1:3])
+
+
+def parse_vrp(input_data):
+    data = input_data if isinstance(input_data, np.ndarray) else tokens(input_data)
+    customer_count = int(data[0])
+    check_length(data, 3 + 3*customer_count, 'vrp')
+    customers = data[3:3 + 3*customer_count].reshape(customer_count, 3)
+    return VrpInstance(int(data[1]), int(data[2]), customers[:, 0].astype(np.int64), customers[:, 1:3])
+
+
+def parse_setcover(input_data):
+    # set lines have a variable number of items so the line structure is needed here,
+    # every line is still tokenised in bulk
+    lines = input_data.split('\n')
+    item_count, set_count = map(int, lines[0].split())
+    costs = np.empty(set_count, dtype=np.float64)
+    sets = []
+    for i in range(set_count):
+        row = tokens(lines[i + 1])
+        costs[i] = row[0]
+        sets.append(row[1:].astype(np.int64))
+    return SetCoverInstance(item_count, costs, sets)
@@ -29,7 +29,10 @@ public class Solver {
         for(String arg : args){
             if(arg.startsWith("-file=")){
                 fileName = arg.substring(6);
-            } 
+            } else if(arg.equals("-worker")){
+                serve(System.in, System.out);
+                return;
+            }
         }
         if(fileName == null)
             return;
@@ -47,8 +50,46 @@ public class Solver {
         finally {
             input.close();
         }
-        
-        
+
+        System.out.print(solveLines(lines));
+    }
+
+    /**
+     * Worker mode: keep the JVM alive and answer instances streamed over stdin.
+     * Every message in both directions is a 4 byte big-endian length followed by
+     * that many bytes of UTF-8 text (the instance in, the solution out).
+     */
+    public static void serve(InputStream in, OutputStream out) throws IOException {
+        DataInputStream input = new DataInputStream(new BufferedInputStream(in));
+        DataOutputStream output = new DataOutputStream(new BufferedOutputStream(out));
+        while(true){
+            int length;
+            try {
+                length = input.readInt();
+            } catch (EOFException e) {
+                return;
+            }
+            byte[] request = new byte[length];
+            input.readFully(request);
+
+            List<String> lines = new ArrayList<String>();
+            BufferedReader reader = new BufferedReader(new StringReader(new String(request, "UTF-8")));
+            String line = null;
+            while (( line = reader.readLine()) != null){
+                lines.add(line);
+            }
+
+            byte[] response = solveLines(lines).getBytes("UTF-8");
+            output.writeInt(response.length);
+            output.write(response);
+            output.flush();
+        }
+    }
+
+    /**
+     * Solve an instance given as its lines and return the solution text
+     */
+    public static String solveLines(List<String> lines) {
         // parse the data in the file
         String[] firstLine = lines.get(0).split("\\s+");
         int items = Integer.parseInt(firstLine[0]);
@@ -82,10 +123,12 @@ public class Solver {
         }
         
         // prepare the solution in the specified output format
-        System.out.println(value+" 0");
+        StringBuilder solution = new StringBuilder();
+        solution.append(value+" 0\n");
         for(int i=0; i < items; i++){
-            System.out.print(taken[i]+" ");
+            solution.append(taken[i]+" ");
         }
-        System.out.println("");        
+        solution.append("\n");
+        return solution.toString();
     }
-}
\ No newline at end of file
+}
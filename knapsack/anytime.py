@@ -0,0 +1,101 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import time
+
+import numpy as np
+
+from solver_old import greedy
+from branch_and_bound import density, build_prefix_sums, dantzig_bound, branch_and_bound_incumbents
+
+
+def improve(items, capacity, taken):
+    # best 'add one' / 'swap one out for one in' move, repeated while it pays
+    # for every taken item the best non-taken item fitting in the freed room is
+    # found with a searchsorted over the non-taken items sorted by weight
+    values = np.array([item.value for item in items], dtype=np.int64)
+    weights = np.array([item.weight for item in items], dtype=np.int64)
+    index = np.array([item.index for item in items], dtype=np.int64)
+    taken = np.array(taken, dtype=np.uint8)
+    mask = taken[index].astype(bool)
+    room = capacity - int(weights[mask].sum())
+
+    while True:
+        outside = np.flatnonzero(~mask)
+        if len(outside) == 0:
+            return
+        order = outside[np.argsort(weights[outside], kind='stable')]
+        sorted_weights = weights[order]
+        best_so_far = np.maximum.accumulate(values[order])
+        # position of (an item reaching) the running maximum so the move can be made
+        reaches = values[order] == best_so_far
+        best_at = np.maximum.accumulate(np.where(reaches, np.arange(len(order)), 0))
+
+        # plain add: the best item fitting in the current room
+        k = int(np.searchsorted(sorted_weights, room, side='right')) - 1
+        best_gain = int(best_so_far[k]) if k >= 0 else 0
+        move_in, move_out = (order[best_at[k]], None) if best_gain > 0 else (None, None)
+
+        inside = np.flatnonzero(mask)
+        if len(inside):
+            fits = np.searchsorted(sorted_weights, room + weights[inside], side='right') - 1
+            gains = np.where(fits >= 0, best_so_far[np.maximum(fits, 0)], 0) - values[inside]
+            best = int(np.argmax(gains))
+            if gains[best] > best_gain and fits[best] >= 0:
+                best_gain = int(gains[best])
+                move_in, move_out = order[best_at[fits[best]]], inside[best]
+
+        if best_gain <= 0:
+            return
+        mask[move_in] = True
+        room -= int(weights[move_in])
+        if move_out is not None:
+            mask[move_out] = False
+            room += int(weights[move_out])
+        taken = np.zeros(len(taken), dtype=np.uint8)
+        taken[index[mask]] = 1
+        yield int(values[mask].sum()), taken
+
+
+def solve_anytime(items, capacity, time_limit=None):
+    # yields (value, taken, upper_bound) every time a better solution is found:
+    # the greedy fill first, then local improvement, then exact branch and bound
+    # seeded with the best so far; the caller can stop iterating at any point and
+    # keep the last triple, or pass time_limit to bound the exact search. the
+    # value is proven optimal once it reaches the upper bound
+    start = time.time()
+    items = sorted(items, key=density, reverse=True)
+    weight_sums, value_sums = build_prefix_sums(items)
+    upper_bound = dantzig_bound(0, 0, capacity, items, weight_sums, value_sums)
+
+    best_value, best_taken = greedy(items, capacity)
+    yield best_value, best_taken, upper_bound
+
+    for value, taken in improve(items, capacity, best_taken):
+        if time_limit is not None and time.time() - start > time_limit:
+            return
+        best_value, best_taken = value, taken
+        yield best_value, best_taken, upper_bound
+
+    if time_limit is None:
+        time_limit = float('inf')
+    remaining = time_limit - (time.time() - start)
+    if remaining <= 0:
+        return
+    for value, taken, bound in branch_and_bound_incumbents(items, capacity, time_limit=remaining,
+                                                           incumbent=(best_value, best_taken)):
+        # the last triple comes with the bound proven when the search stopped,
+        # passed on even without a better value so the caller sees the proof
+        if value > best_value or bound < upper_bound:
+            best_value, best_taken, upper_bound = value, taken, min(bound, upper_bound)
+            yield best_value, best_taken, upper_bound
+
+
+def best_before(items, capacity, time_limit):
+    # best solution found within the wall clock budget as (value, taken, proven)
+    deadline = time.time() + time_limit
+    value, taken, upper_bound = None, None, None
+    for value, taken, upper_bound in solve_anytime(items, capacity, time_limit):
+        if time.time() > deadline:
+            break
+    return value, taken, value >= upper_bound
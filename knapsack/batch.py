@@ -0,0 +1,78 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# solves every knapsack instance of a directory in parallel
+# python batch.py ./data results.json [time_limit] [engine]
+
+import json
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import solver
+
+
+class InstanceTimeout(Exception):
+    pass
+
+
+def on_alarm(signum, frame):
+    raise InstanceTimeout()
+
+
+def solve_file(file_location, time_limit, engine=None):
+    # runs in a worker process; the engines' own budgets are set to the time
+    # limit and an alarm at twice the limit stops engines that have no budget
+    solver.BNB_TIME_LIMIT = time_limit
+    solver.ANYTIME_TIME_LIMIT = time_limit
+    if hasattr(signal, 'SIGALRM'):
+        signal.signal(signal.SIGALRM, on_alarm)
+        signal.alarm(int(2*time_limit) + 1)
+
+    start = time.time()
+    try:
+        with open(file_location, 'r') as input_data_file:
+            input_data = input_data_file.read()
+        solution = solver.solve_it(input_data, engine)
+        status = 'solved'
+    except InstanceTimeout:
+        solution = None
+        status = 'timeout'
+    finally:
+        if hasattr(signal, 'SIGALRM'):
+            signal.alarm(0)
+
+    return {'solution': solution, 'status': status, 'seconds': round(time.time() - start, 3)}
+
+
+def solve_directory(data_directory, results_file, time_limit=60.0, engine=None, workers=None):
+    # largest files are submitted first so the big instances do not end up as
+    # the tail of the batch while every other core sits idle
+    files = [os.path.join(data_directory, name) for name in os.listdir(data_directory)]
+    files = sorted((f for f in files if os.path.isfile(f)), key=os.path.getsize, reverse=True)
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = {executor.submit(solve_file, f, time_limit, engine): f for f in files}
+        for future in as_completed(futures):
+            name = os.path.basename(futures[future])
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                results[name] = {'solution': None, 'status': 'error: ' + str(e), 'seconds': None}
+            print(name, results[name]['status'], results[name]['seconds'])
+
+    with open(results_file, 'w') as output_file:
+        json.dump(results, output_file, indent=2, sort_keys=True)
+    return results
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2:
+        time_limit = float(sys.argv[3]) if len(sys.argv) > 3 else 60.0
+        engine = sys.argv[4].strip() if len(sys.argv) > 4 else None
+        solve_directory(sys.argv[1].strip(), sys.argv[2].strip(), time_limit, engine)
+    else:
+        print('This requires a data directory and a results file. (i.e. python batch.py ./data results.json)')
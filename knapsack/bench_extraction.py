@@ -0,0 +1,53 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# micro-benchmark of turning a solved knapsack into the output string
+# python bench_extraction.py
+
+import random
+import time
+
+import numpy as np
+
+from solver import format_solution
+
+
+def old_extraction(item_count, weights, packed_items):
+    # what solve_it used to do: membership test on the packed list for every item
+    bool_items = []
+    for i in range(item_count):
+        if i in packed_items:
+            bool_items.append(1)
+        else:
+            bool_items.append(0)
+    packed_weights = [weights[i] for i in packed_items]
+    output_data = str(sum(packed_weights)) + ' ' + str(1) + '\n'
+    output_data += ' '.join(map(str, bool_items))
+    return output_data
+
+
+def new_extraction(values, weights, taken):
+    return format_solution(values, taken)
+
+
+def timed(fun, *args):
+    start = time.time()
+    fun(*args)
+    return time.time() - start
+
+
+if __name__ == '__main__':
+    random.seed(0)
+    for item_count in (10**4, 10**6):
+        values = [random.randint(1, 1000) for _ in range(item_count)]
+        weights = [random.randint(1, 1000) for _ in range(item_count)]
+        taken = np.zeros(item_count, dtype=np.uint8)
+        taken[random.sample(range(item_count), item_count // 2)] = 1
+        packed_items = [i for i in range(item_count) if taken[i]]
+
+        print('items', item_count)
+        print('  new extraction %.4fs' % timed(new_extraction, values, weights, taken))
+        if item_count <= 10**4:
+            print('  old extraction %.4fs' % timed(old_extraction, item_count, weights, packed_items))
+        else:
+            print('  old extraction skipped, quadratic in the item count')
@@ -0,0 +1,42 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+
+def bitset_dp(values, weights, capacity):
+    # capacity dynamic programming where every item is one vectorised row update
+    # row[c] is the best value reachable with capacity c using the items seen so far
+    # the take/skip decision of item i at capacity c is kept as a single bit so the
+    # decision table costs items * capacity / 8 bytes instead of a full int table
+    item_count = len(values)
+    row = np.zeros(capacity + 1, dtype=np.int64)
+    row_bytes = (capacity + 8) // 8
+    decisions = np.zeros((item_count, row_bytes), dtype=np.uint8)
+    # per item scratch, allocated once: candidate values and the take mask
+    candidate = np.empty(capacity + 1, dtype=np.int64)
+    take = np.zeros(capacity + 1, dtype=bool)
+
+    for i in range(item_count):
+        w = weights[i]
+        v = values[i]
+        if w > capacity or v <= 0:
+            continue
+        # candidate has to be materialised before row[w:] is overwritten in place
+        span = capacity + 1 - w
+        np.add(row[:span], v, out=candidate[:span])
+        # decisions for capacities below w are always 'skip'
+        take[:w] = False
+        np.greater(candidate[:span], row[w:], out=take[w:])
+        np.maximum(row[w:], candidate[:span], out=row[w:])
+        decisions[i] = np.packbits(take)
+
+    # walk the decision bits back from the full capacity
+    taken = np.zeros(item_count, dtype=np.uint8)
+    c = capacity
+    for i in range(item_count - 1, -1, -1):
+        if (decisions[i, c >> 3] >> (7 - (c & 7))) & 1:
+            taken[i] = 1
+            c -= weights[i]
+
+    return int(row[capacity]), taken
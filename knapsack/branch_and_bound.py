@@ -0,0 +1,123 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import heapq
+import itertools
+import time
+from bisect import bisect_right
+
+from solver_old import greedy
+
+
+def density(item):
+    if item.weight == 0:
+        return float('inf')
+    return item.value / float(item.weight)
+
+
+def build_prefix_sums(items):
+    weight_sums = [0]
+    value_sums = [0]
+    for item in items:
+        weight_sums.append(weight_sums[-1] + item.weight)
+        value_sums.append(value_sums[-1] + item.value)
+    return weight_sums, value_sums
+
+
+def dantzig_bound(depth, value, room, items, weight_sums, value_sums):
+    # fill the room with items depth.. in density order, the break item fractionally
+    # prefix sums let us find the break item with one bisect instead of a scan
+    break_idx = bisect_right(weight_sums, weight_sums[depth] + room) - 1
+    bound = value + value_sums[break_idx] - value_sums[depth]
+    if break_idx < len(items):
+        left = room - (weight_sums[break_idx] - weight_sums[depth])
+        bound += left * items[break_idx].value // items[break_idx].weight
+    return bound
+
+
+def chain_to_taken(chain, item_count):
+    taken = bytearray(item_count)
+    while chain is not None:
+        index, chain = chain
+        taken[index] = 1
+    return taken
+
+
+def branch_and_bound_incumbents(items, capacity, time_limit=60.0, node_limit=10**7, incumbent=None):
+    # best-first branch and bound on the density-sorted items
+    # yields (value, taken, upper_bound) every time a dive improves the incumbent
+    # and once more when the search stops, with the bound proven at that point
+    item_count = len(items)
+    start = time.time()
+
+    items = sorted(items, key=density, reverse=True)
+    weight_sums, value_sums = build_prefix_sums(items)
+
+    # incumbent from the caller or from the greedy pass over the density order
+    if incumbent is None:
+        incumbent = greedy(items, capacity)
+    best_value, best_taken = incumbent
+    best_chain = None
+
+    # a node is (-bound, -depth, seq, value, room, chain) where chain is a linked
+    # list (original index, parent chain) of the items taken so far; ties on the
+    # bound go to the deepest node and seq keeps the chains out of the comparison
+    seq = itertools.count()
+    root_bound = dantzig_bound(0, 0, capacity, items, weight_sums, value_sums)
+    frontier = [(-root_bound, 0, next(seq), 0, capacity, None)]
+    nodes = 0
+    upper_bound = root_bound
+
+    while frontier:
+        neg_bound, neg_depth, _, value, room, chain = heapq.heappop(frontier)
+        upper_bound = -neg_bound
+        depth = -neg_depth
+        if upper_bound <= best_value:
+            # best-first: nothing left in the frontier can beat the incumbent
+            upper_bound = best_value
+            break
+
+        # dive following the greedy order, pushing the skip branches onto the heap
+        improved = False
+        while depth < item_count:
+            nodes += 1
+            item = items[depth]
+            if item.weight <= room:
+                skip_bound = dantzig_bound(depth + 1, value, room, items, weight_sums, value_sums)
+                if skip_bound > best_value:
+                    heapq.heappush(frontier, (-skip_bound, -depth - 1, next(seq),
+                                              value, room, chain))
+                # taking an item that fits leaves the bound unchanged
+                value += item.value
+                room -= item.weight
+                chain = (item.index, chain)
+                if value > best_value:
+                    best_value = value
+                    best_chain = chain
+                    improved = True
+            else:
+                # the break item does not fit, skipping it moves the bound down
+                bound = dantzig_bound(depth + 1, value, room, items, weight_sums, value_sums)
+                if bound <= best_value:
+                    break
+            depth += 1
+
+        if improved:
+            best_taken = chain_to_taken(best_chain, item_count)
+            yield best_value, best_taken, upper_bound
+
+        if nodes >= node_limit or time.time() - start > time_limit:
+            if frontier:
+                upper_bound = max(upper_bound, -frontier[0][0])
+            break
+    else:
+        upper_bound = best_value
+
+    yield best_value, best_taken, max(upper_bound, best_value)
+
+
+def branch_and_bound(items, capacity, time_limit=60.0, node_limit=10**7):
+    # returns (value, taken, gap); gap is 0 when the value is proven optimal
+    for value, taken, upper_bound in branch_and_bound_incumbents(items, capacity, time_limit, node_limit):
+        pass
+    return value, taken, upper_bound - value
@@ -0,0 +1,55 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from solver_old import greedy
+from branch_and_bound import density
+
+
+def reduce_to_core(items, capacity, window=25):
+    # fixes items that are obviously in or obviously out and returns the rest
+    # returns (fixed_in, fixed_out, core_items, core_capacity) where fixed_in
+    # and fixed_out are original indices that are always / never taken and
+    # core_items still have to be decided
+    items = sorted(items, key=density, reverse=True)
+
+    # break item: the first item of the density order that no longer fits
+    room = capacity
+    prefix_value = 0
+    break_idx = len(items)
+    for idx, item in enumerate(items):
+        if item.weight > room:
+            break_idx = idx
+            break
+        room -= item.weight
+        prefix_value += item.value
+
+    if break_idx == len(items):
+        return [item.index for item in items], [], [], room
+
+    # everything is scaled by the break weight so the tests stay in integers
+    # lp bound: prefix_value + room * break_value / break_weight
+    # reduced cost of j: value_j - weight_j * break_value / break_weight
+    break_item = items[break_idx]
+    scale = break_item.weight
+    upper = prefix_value * scale + room * break_item.value
+    lower, _ = greedy(items, capacity)
+    lower *= scale
+
+    # flipping j away from its lp value costs at least |reduced cost| on the bound,
+    # when what is left falls strictly below the incumbent j can be fixed
+    fixed_in = []
+    fixed_out = []
+    core_items = []
+    core_capacity = capacity
+    for idx, item in enumerate(items):
+        reduced_cost = abs(item.value * scale - item.weight * break_item.value)
+        if abs(idx - break_idx) > window and upper - reduced_cost < lower:
+            if idx < break_idx:
+                fixed_in.append(item.index)
+                core_capacity -= item.weight
+            else:
+                fixed_out.append(item.index)
+        else:
+            core_items.append(item)
+
+    return fixed_in, fixed_out, core_items, core_capacity
@@ -0,0 +1,44 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from bitset_dp import bitset_dp
+
+# below this many items the packed decision table is no bigger than one int64 row
+BITSET_ITEMS = 64
+
+
+def best_values(values, weights, capacity):
+    # last row of the capacity dp, only one row is ever alive
+    row = np.zeros(capacity + 1, dtype=np.int64)
+    for v, w in zip(values, weights):
+        if w > capacity or v <= 0:
+            continue
+        candidate = row[:capacity + 1 - w] + v
+        np.maximum(row[w:], candidate, out=row[w:])
+    return row
+
+
+def hirschberg_dp(values, weights, capacity):
+    # divide and conquer on the item list so peak memory stays O(capacity)
+    # the two halves are solved forward, the capacity is split where their sum
+    # peaks and each half is recursed on with its share of the capacity
+    taken = np.zeros(len(values), dtype=np.uint8)
+    stack = [(0, len(values), capacity)]
+    while stack:
+        lo, hi, cap = stack.pop()
+        if hi - lo <= BITSET_ITEMS:
+            _, part = bitset_dp(values[lo:hi], weights[lo:hi], cap)
+            taken[lo:hi] = part
+            continue
+        mid = (lo + hi) // 2
+        left = best_values(values[lo:mid], weights[lo:mid], cap)
+        right = best_values(values[mid:hi], weights[mid:hi], cap)
+        split = int(np.argmax(left + right[::-1]))
+        del left, right
+        stack.append((lo, mid, split))
+        stack.append((mid, hi, cap - split))
+
+    value = int(np.dot(values, taken)) if len(values) else 0
+    return value, taken
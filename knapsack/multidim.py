@@ -0,0 +1,75 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# multidimensional knapsack: values (n,), weights (K, n), capacities (K,)
+
+import numpy as np
+
+
+def surrogate_bound(values, weights, capacities, multipliers):
+    # lp bound of the surrogate problem where the K constraints are collapsed
+    # into one with the given non negative multipliers; also returns the lp x
+    surrogate_weights = multipliers.dot(weights)
+    surrogate_capacity = multipliers.dot(capacities)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        density = np.where(surrogate_weights > 0, values / surrogate_weights, np.inf)
+    order = np.argsort(-density, kind='stable')
+    weight_sums = np.cumsum(surrogate_weights[order])
+    full = int(np.searchsorted(weight_sums, surrogate_capacity, side='right'))
+
+    x = np.zeros(len(values))
+    x[order[:full]] = 1.0
+    bound = values[order[:full]].sum()
+    if full < len(values):
+        left = surrogate_capacity - (weight_sums[full - 1] if full else 0.0)
+        x[order[full]] = left / surrogate_weights[order[full]]
+        bound += values[order[full]] * x[order[full]]
+    return bound, x, order
+
+
+def fill(values, weights, capacities, order):
+    # takes items in the given order whenever they fit in every dimension
+    taken = np.zeros(len(values), dtype=np.uint8)
+    room = capacities.astype(np.int64).copy()
+    for j in order:
+        column = weights[:, j]
+        if np.all(column <= room):
+            taken[j] = 1
+            room -= column
+    return taken
+
+
+def surrogate_heuristic(values, weights, capacities, iterations=50, step=1.0):
+    # subgradient search over the surrogate multipliers; every multiplier vector
+    # gives an upper bound (kept when it is the tightest) and a density order
+    # that is turned into a feasible solution by fill()
+    # returns (value, taken, upper_bound)
+    values = np.asarray(values, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.int64)
+    capacities = np.asarray(capacities, dtype=np.int64)
+    scale = np.maximum(capacities, 1).astype(np.float64)
+
+    multipliers = 1.0 / scale
+    multipliers /= multipliers.sum()
+    best_value, best_taken = -1, None
+    upper_bound = np.inf
+    for _ in range(iterations):
+        bound, x, order = surrogate_bound(values, weights, capacities, multipliers)
+        upper_bound = min(upper_bound, bound)
+
+        taken = fill(values, weights, capacities, order)
+        value = int(values.dot(taken))
+        if value > best_value:
+            best_value, best_taken = value, taken
+        if best_value >= np.floor(upper_bound + 1e-6):
+            break
+
+        # constraints the lp solution overloads get a larger share of the surrogate
+        violation = (weights.dot(x) - capacities) / scale
+        if np.all(violation <= 0):
+            break
+        multipliers = multipliers * np.maximum(1.0 + step * violation, 0.1)
+        multipliers /= multipliers.sum()
+        step *= 0.9
+
+    return best_value, best_taken, int(np.floor(upper_bound + 1e-6))
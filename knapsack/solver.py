@@ -1,57 +1,188 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
-from ortools.algorithms import pywrapknapsack_solver
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from instance_parser import parse_knapsack, parse_multi_knapsack, knapsack_dimensions
+
+import numpy as np
 
 from collections import namedtuple
 Item = namedtuple("Item", ['index', 'value', 'weight'])
 
+# which engine solve_it uses: 'bitset_dp' (native numpy), 'hirschberg_dp' (numpy,
+# O(capacity) memory), 'branch_and_bound', 'anytime' or 'ortools'
+ENGINE = 'bitset_dp'
+# above this capacity the default gives way to LARGE_CAPACITY_ENGINE: the bitset
+# dp's capacity sized rows cost more time and memory than or-tools' dp there
+LARGE_CAPACITY = 10**7
+LARGE_CAPACITY_ENGINE = 'ortools'
+BNB_TIME_LIMIT = 60.0
+BNB_NODE_LIMIT = 10**7
+# wall clock budget of the anytime engine, the best solution so far is kept
+ANYTIME_TIME_LIMIT = 60.0
+# engine for instances with more than one weight dimension: 'surrogate' (native
+# surrogate relaxation heuristic) or 'ortools' (multidimensional branch and bound)
+MULTIDIM_ENGINE = 'surrogate'
+# fix the obviously in / obviously out items before handing the rest to the engine
+REDUCE_TO_CORE = True
 
-def solve_it(input_data):
-    # Modify this code to run your optimization algorithm
 
-    # parse the input
-    lines = input_data.split('\n')
+def log(*args):
+    # progress notes go to stderr, stdout is the solution
+    print(*args, file=sys.stderr)
+
+
+def solve_with_bitset_dp(values, weights, capacity):
+    from bitset_dp import bitset_dp
+    _, taken = bitset_dp(values, weights[0], capacity)
+    return taken, 1
+
+
+def solve_with_hirschberg_dp(values, weights, capacity):
+    from hirschberg_dp import hirschberg_dp
+    _, taken = hirschberg_dp(values, weights[0], capacity)
+    return taken, 1
+
+
+def solve_with_branch_and_bound(values, weights, capacity):
+    from branch_and_bound import branch_and_bound
+    items = [Item(i, values[i], weights[0][i]) for i in range(len(values))]
+    value, taken, gap = branch_and_bound(items, capacity,
+                                         time_limit=BNB_TIME_LIMIT,
+                                         node_limit=BNB_NODE_LIMIT)
+    if gap > 0:
+        log('branch and bound stopped early, value', value, 'proven gap', gap)
+    return taken, int(gap == 0)
 
-    firstLine = lines[0].split()
-    item_count = int(firstLine[0])
-    capacity = int(firstLine[1])
+
+def solve_with_anytime(values, weights, capacity):
+    from anytime import best_before
+    items = [Item(i, values[i], weights[0][i]) for i in range(len(values))]
+    value, taken, proven = best_before(items, capacity, ANYTIME_TIME_LIMIT)
+    return taken, int(proven)
+
+
+def solve_with_ortools(values, weights, capacity):
+    from ortools.algorithms import pywrapknapsack_solver
 
     solver = pywrapknapsack_solver.KnapsackSolver(
         pywrapknapsack_solver.KnapsackSolver.
             KNAPSACK_DYNAMIC_PROGRAMMING_SOLVER,
         'test')
 
-    values = []
-    weights = []
-    for line_idx in range(1, item_count+1):
-        line = lines[line_idx]
-        parts = line.split()
-        #val we
-        values.append(int(parts[0]))
-        weights.append(int(parts[1]))
+    solver.Init(values, weights, [capacity])
+
+    solver.Solve()
+
+    # the swig wrapper only answers one item at a time, fill a preallocated buffer
+    taken = bytearray(len(weights[0]))
+    contains = solver.BestSolutionContains
+    for x in range(len(taken)):
+        if contains(x):
+            taken[x] = 1
+    return taken, 1
 
-    weights=[weights]
 
-    solver.Init(values, weights, [capacity])
+# engines take (values, [weights], capacity) and return (0/1 vector over their
+# items, 1 when the vector is proven optimal else 0)
+ENGINES = {
+    'bitset_dp': solve_with_bitset_dp,
+    'hirschberg_dp': solve_with_hirschberg_dp,
+    'branch_and_bound': solve_with_branch_and_bound,
+    'anytime': solve_with_anytime,
+    'ortools': solve_with_ortools,
+}
+
+
+def solve_multidim_with_surrogate(values, weights, capacities):
+    from multidim import surrogate_heuristic
+    value, taken, upper_bound = surrogate_heuristic(values, weights, capacities)
+    log('surrogate heuristic value', value, 'upper bound', upper_bound)
+    return taken
+
+
+def solve_multidim_with_ortools(values, weights, capacities):
+    from ortools.algorithms import pywrapknapsack_solver
+
+    solver = pywrapknapsack_solver.KnapsackSolver(
+        pywrapknapsack_solver.KnapsackSolver.
+            KNAPSACK_MULTIDIMENSION_BRANCH_AND_BOUND_SOLVER,
+        'multidim')
+
+    solver.Init(values.tolist(), weights.tolist(), capacities.tolist())
 
     solver.Solve()
 
-    packed_items = [x for x in range(0, len(weights[0]))
-                    if solver.BestSolutionContains(x)]
+    taken = bytearray(len(values))
+    contains = solver.BestSolutionContains
+    for x in range(len(taken)):
+        if contains(x):
+            taken[x] = 1
+    return taken
+
 
-    bool_items = []
-    for i in range(item_count):
-        if i in packed_items:
-            bool_items.append(1)
-        else:
-            bool_items.append(0)
+# multidimensional engines take (values (n,), weights (K, n), capacities (K,)) arrays
+MULTIDIM_ENGINES = {
+    'surrogate': solve_multidim_with_surrogate,
+    'ortools': solve_multidim_with_ortools,
+}
 
 
-    packed_weights = [weights[0][i] for i in packed_items]
+def format_solution(values, taken, optimal=1):
+    # objective straight from the taken vector
+    value = int(np.dot(values, taken))
+
+    # '0 1 1 0' written as bytes in one go instead of joining n small strings
+    text = np.full(max(2*len(taken) - 1, 0), ord(' '), dtype=np.uint8)
+    text[::2] = taken + ord('0')
+    output_data = str(value) + ' ' + str(optimal) + '\n'
+    output_data += text.tobytes().decode('ascii')
+    return output_data
+
+
+def solve_it(input_data, engine=None):
+    # Modify this code to run your optimization algorithm
+
+    # parse the input
+    if knapsack_dimensions(input_data) > 1:
+        instance = parse_multi_knapsack(input_data)
+        solve = MULTIDIM_ENGINES[engine or MULTIDIM_ENGINE]
+        taken = np.asarray(solve(instance.values, instance.weights, instance.capacities), dtype=np.uint8)
+        # neither multidimensional engine reports a proof, so optimality is not claimed
+        return format_solution(instance.values, taken, optimal=0)
+
+    instance = parse_knapsack(input_data)
+    item_count = len(instance.values)
+    capacity = instance.capacity
+
+    values = instance.values.tolist()
+    weights = [instance.weights.tolist()]
+
+    if engine is None:
+        engine = LARGE_CAPACITY_ENGINE if capacity > LARGE_CAPACITY else ENGINE
+    solve = ENGINES[engine]
+    if REDUCE_TO_CORE:
+        from core import reduce_to_core
+        items = [Item(i, values[i], weights[0][i]) for i in range(item_count)]
+        fixed_in, fixed_out, core_items, core_capacity = reduce_to_core(items, capacity)
+        log('fixed items', len(fixed_in), 'in', len(fixed_out), 'out', 'of', item_count,
+            'core capacity', core_capacity)
+        taken = np.zeros(item_count, dtype=np.uint8)
+        taken[fixed_in] = 1
+        optimal = 1
+        if core_items:
+            core_taken, optimal = solve([item.value for item in core_items],
+                               [[item.weight for item in core_items]],
+                               core_capacity)
+            core_index = [item.index for item in core_items]
+            taken[core_index] = np.asarray(core_taken, dtype=np.uint8)
+    else:
+        taken, optimal = solve(values, weights, capacity)
+        taken = np.asarray(taken, dtype=np.uint8)
 
     # prepare the solution in the specified output format
-    output_data = str(sum(packed_weights)) + ' ' + str(1) + '\n'
-    output_data += ' '.join(map(str, bool_items))
+    output_data = format_solution(values, taken, optimal)
     return output_data
 
 
@@ -59,9 +190,10 @@ if __name__ == '__main__':
     import sys
     if len(sys.argv) > 1:
         file_location = sys.argv[1].strip()
+        engine = sys.argv[2].strip() if len(sys.argv) > 2 else None
         with open(file_location, 'r') as input_data_file:
             input_data = input_data_file.read()
-        print(solve_it(input_data))
+        print(solve_it(input_data, engine))
     else:
         print('This test requires an input file.  Please select one from the data directory. (i.e. python solver.py ./data/ks_4_0)')
 
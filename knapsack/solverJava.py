@@ -1,27 +1,137 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
+import atexit
 import os
+import struct
+import tempfile
+import threading
 from subprocess import Popen, PIPE
 
-def solve_it(input_data):
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+
+# command of a long lived worker speaking the length-prefixed protocol
+WORKER_COMMAND = ['java', 'Solver', '-worker']
+# number of workers kept alive by solve_it, 0 spawns one JVM per call instead
+POOL_SIZE = 1
+
+
+def write_frame(stream, payload):
+    # a frame is a 4 byte big-endian length followed by the payload bytes
+    stream.write(struct.pack('>I', len(payload)))
+    stream.write(payload)
+    stream.flush()
+
+
+def read_exactly(stream, size):
+    chunks = []
+    while size > 0:
+        chunk = stream.read(size)
+        if not chunk:
+            raise RuntimeError('solver worker closed its output')
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def read_frame(stream):
+    size, = struct.unpack('>I', read_exactly(stream, 4))
+    return read_exactly(stream, size)
+
+
+class WorkerPool(object):
+    '''
+    Keeps size solver processes alive and streams instances to them over
+    stdin/stdout, so the JVM start-up is paid once per worker instead of
+    once per instance. solve() is thread safe: each call checks a worker out
+    of the pool, so up to size instances run in parallel.
+    '''
+
+    def __init__(self, size=1, command=None):
+        self.command = list(command or WORKER_COMMAND)
+        self.workers = [Popen(self.command, stdin=PIPE, stdout=PIPE) for _ in range(size)]
+        self.idle = Queue()
+        for worker in self.workers:
+            self.idle.put(worker)
+
+    def solve(self, input_data):
+        worker = self.idle.get()
+        try:
+            write_frame(worker.stdin, input_data.encode('utf-8'))
+            solution = read_frame(worker.stdout).decode('utf-8')
+        except Exception:
+            # a worker that broke mid-message can not be trusted, replace it
+            worker.kill()
+            worker = Popen(self.command, stdin=PIPE, stdout=PIPE)
+            raise
+        finally:
+            self.idle.put(worker)
+        return solution.strip()
+
+    def map(self, instances):
+        # solves every instance, at most one per worker at a time, keeping the order
+        results = [None]*len(instances)
 
-    # Writes the inputData to a temporay file
+        def run(idx):
+            results[idx] = self.solve(instances[idx])
 
-    tmp_file_name = 'tmp.data'
-    tmp_file = open(tmp_file_name, 'w')
-    tmp_file.write(input_data)
-    tmp_file.close()
+        threads = [threading.Thread(target=run, args=(idx,)) for idx in range(len(instances))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def close(self):
+        # closing stdin is the shutdown signal, the worker exits on end of stream
+        while not self.idle.empty():
+            worker = self.idle.get()
+            worker.stdin.close()
+            worker.wait()
+            worker.stdout.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool(POOL_SIZE)
+            atexit.register(_pool.close)
+    return _pool
+
+
+def solve_once(input_data):
+
+    # Writes the inputData to a temporay file, unique per call so that
+    # concurrent callers do not overwrite each other
+
+    tmp_fd, tmp_file_name = tempfile.mkstemp(suffix='.data')
+    with os.fdopen(tmp_fd, 'w') as tmp_file:
+        tmp_file.write(input_data)
 
     # Runs the command: java Solver -file=tmp.data
 
-    process = Popen(['java', 'Solver', '-file=' + tmp_file_name], stdout=PIPE)
-    (stdout, stderr) = process.communicate()
+    try:
+        process = Popen(['java', 'Solver', '-file=' + tmp_file_name], stdout=PIPE)
+        (stdout, stderr) = process.communicate()
+    finally:
+        # removes the temporay file
+        os.remove(tmp_file_name)
 
-    # removes the temporay file
-    os.remove(tmp_file_name)
+    return stdout.decode('utf-8').strip()
 
-    return stdout.strip()
+
+def solve_it(input_data):
+    if POOL_SIZE > 0:
+        return get_pool().solve(input_data)
+    return solve_once(input_data)
 
 
 import sys
@@ -31,7 +141,6 @@ if __name__ == '__main__':
         file_location = sys.argv[1].strip()
         with open(file_location, 'r') as input_data_file:
             input_data = input_data_file.read()
-        print solve_it(input_data)
+        print(solve_it(input_data))
     else:
         print('This test requires an input file.  Please select one from the data directory. (i.e. python solver.py ./data/ks_4_0)')
-
@@ -31,6 +31,10 @@ def generage_set_coverage_vector(s, total_items):
 
 
 from collections import namedtuple
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from instance_parser import parse_setcover
 from ortools.sat.python import cp_model
 
 
@@ -42,16 +46,12 @@ def solve_it(input_data):
     # Modify this code to run your optimization algorithm
 
     # parse the input
-    lines = input_data.split('\n')
-
-    parts = lines[0].split()
-    item_count = int(parts[0])
-    set_count = int(parts[1])
-    
-    sets = []
-    for i in range(1, set_count+1):
-        parts = lines[i].split()
-        sets.append(Set(i-1, float(parts[0]), map(int, parts[1:])))
+    instance = parse_setcover(input_data)
+    item_count = instance.item_count
+    set_count = len(instance.sets)
+
+    sets = [Set(i, cost, items.tolist()) for i, (cost, items)
+            in enumerate(zip(instance.costs.tolist(), instance.sets))]
 
     cpmodel = cp_model.CpModel()
     set_list_binary = [cpmodel.NewIntVar(0, 1, 'set_{i}'.format(i=i)) for i in range(set_count)]
@@ -0,0 +1,53 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# micro-benchmark of the arc cost callback the routing solver calls for
+# every arc it evaluates
+# python bench_callback.py [seconds]
+
+import math
+import random
+import sys
+import time
+
+import numpy as np
+
+from distances import build_distance_matrix
+from solver import create_distance_callback
+
+
+def old_callback(coordinates):
+    # what solve_it used to register: a closure over nested lists of floats
+    dist_matrix = [[math.sqrt((x1 - x2)**2 + (y1 - y2)**2) for x2, y2 in coordinates]
+                   for x1, y1 in coordinates]
+
+    def distance_callback(from_node, to_node):
+        return int(dist_matrix[from_node][to_node])
+
+    return distance_callback
+
+
+def calls_per_second(callback, arcs, seconds):
+    count = 0
+    start = time.time()
+    while time.time() - start < seconds:
+        for from_node, to_node in arcs:
+            callback(from_node, to_node)
+        count += len(arcs)
+    return count / (time.time() - start)
+
+
+if __name__ == '__main__':
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    random.seed(0)
+    for node_count in (1000, 3000):
+        coordinates = [(random.uniform(0, 10**5), random.uniform(0, 10**5)) for _ in range(node_count)]
+        arcs = [(random.randrange(node_count), random.randrange(node_count)) for _ in range(10**5)]
+        matrix = build_distance_matrix(np.array(coordinates))
+        callbacks = [('old nested lists', old_callback(coordinates)),
+                     ('flat array', create_distance_callback(matrix)),
+                     ('flat array with index mapping',
+                      create_distance_callback(matrix, range(node_count)))]
+        print('nodes', node_count)
+        for name, callback in callbacks:
+            print('  %s %.0f calls per second' % (name, calls_per_second(callback, arcs, seconds)))
@@ -0,0 +1,64 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+# rows of the matrix computed per numpy broadcast, bounds the float64 temporaries
+BLOCK_ROWS = 1024
+
+
+def distance_rows(coordinates, rows):
+    # euclidean distances from the cities in rows to every city, float64
+    dx = coordinates[rows, 0, None] - coordinates[None, :, 0]
+    dy = coordinates[rows, 1, None] - coordinates[None, :, 1]
+    dx *= dx
+    dy *= dy
+    dx += dy
+    return np.sqrt(dx, out=dx)
+
+
+def build_distance_matrix(coordinates, dtype=np.float32, block_rows=BLOCK_ROWS):
+    # full n x n matrix filled one row block at a time; an integer dtype gets
+    # the rounded distances
+    coordinates = np.asarray(coordinates, dtype=np.float64)
+    node_count = len(coordinates)
+    matrix = np.empty((node_count, node_count), dtype=dtype)
+    integer = np.issubdtype(np.dtype(dtype), np.integer)
+    for first in range(0, node_count, block_rows):
+        block = distance_rows(coordinates, np.arange(first, min(first + block_rows, node_count)))
+        matrix[first:first + len(block)] = np.rint(block) if integer else block
+    return matrix
+
+
+class OnDemandDistances(object):
+    '''
+    Stands in for the distance matrix when n x n would not fit in memory:
+    distances[i] computes row i when asked, so distances[i][j] works as it
+    does on the matrix.
+    '''
+
+    def __init__(self, coordinates, dtype=np.float32):
+        self.coordinates = np.asarray(coordinates, dtype=np.float64)
+        self.dtype = np.dtype(dtype)
+        self.integer = np.issubdtype(self.dtype, np.integer)
+
+    def __len__(self):
+        return len(self.coordinates)
+
+    def __getitem__(self, node):
+        row = distance_rows(self.coordinates, [node])[0]
+        return (np.rint(row) if self.integer else row).astype(self.dtype)
+
+    def distance(self, from_node, to_node):
+        delta = self.coordinates[from_node] - self.coordinates[to_node]
+        value = np.sqrt(delta.dot(delta))
+        return int(round(value)) if self.integer else float(value)
+
+
+def distance_matrix(coordinates, dtype=np.float32, memory_cap=2*1024**3):
+    # the full matrix while n * n entries fit in memory_cap bytes, on demand rows above
+    node_count = len(coordinates)
+    if node_count*node_count*np.dtype(dtype).itemsize > memory_cap:
+        print('distance matrix over the memory cap, computing distances on demand')
+        return OnDemandDistances(coordinates, dtype)
+    return build_distance_matrix(coordinates, dtype)
@@ -0,0 +1,155 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# lin-kernighan style search on a two level list tour: chains of 2-opt moves
+# of bounded depth, each closing the tour, where the chain keeps the shortest
+# tour it passed through, plus or-opt segment moves. once no node improves,
+# local double bridge kicks restart the search until the time limit, keeping
+# a kicked tour only when it ends up shorter
+
+import math
+import random
+import time
+from collections import deque
+
+from two_level_tour import TwoLevelTour
+from local_search import EPSILON, or_opt, tour_length
+
+LK_MAX_DEPTH = 10
+# the double bridge swaps two neighbouring paths of at most this many cities
+KICK_SEGMENT = 50
+
+
+def lin_kernighan(coordinates, tour, neighbours, time_limit=60.0, max_depth=LK_MAX_DEPTH,
+                  kick_segment=KICK_SEGMENT, seed=0):
+    # returns (best tour, history) where history lists (seconds, tour length)
+    # for the first local optimum and every improvement after it
+    start = time.time()
+    node_count = len(tour)
+    xs = [float(x) for x, _ in coordinates]
+    ys = [float(y) for _, y in coordinates]
+    candidates = neighbours.tolist()
+    rand = random.Random(seed)
+    if node_count < 8:
+        return list(tour), [(0.0, tour_length(coordinates, tour))]
+    two_level = TwoLevelTour(tour)
+    succ, pred = two_level.succ, two_level.pred
+    state = {'length': tour_length(coordinates, tour), 'journal': None}
+
+    def dist(a, b):
+        return math.hypot(xs[a] - xs[b], ys[a] - ys[b])
+
+    def apply(a, b, c, d):
+        # the 2-opt (a, b), (c, d) -> (a, c), (b, d), logged while a kick is on trial
+        state['length'] += dist(a, c) + dist(b, d) - dist(a, b) - dist(c, d)
+        two_level.move(a, b, c, d)
+        if state['journal'] is not None:
+            state['journal'].append((a, b, c, d))
+
+    def undo(moves):
+        for a, b, c, d in reversed(moves):
+            state['length'] += dist(a, b) + dist(c, d) - dist(a, c) - dist(b, d)
+            two_level.move(a, c, b, d)
+
+    def insert_segment(p, s1, s2, n, e, f, same):
+        # moves the path s1..s2 (between p and n) between e and f, reversed
+        # unless same; two or three 2-opt moves
+        apply(p, s1, e, f)
+        apply(p, e, n, s2)
+        if same:
+            apply(e, s2, s1, f)
+
+    def lk_chain(t1):
+        # breaks (t1, t2), joins t2 to a candidate t3 and closes with (t4, t1)
+        # where t4 is the neighbour of t3 that keeps one cycle; the new edge
+        # (t1, t4) is broken next, up to max_depth times while the open gain
+        # stays positive. the chain is cut back to its shortest tour
+        for t2 in (succ(t1), pred(t1)):
+            moves = []
+            added = set()
+            start_length = best_length = state['length']
+            best_depth = 0
+            open_gain = dist(t1, t2)
+            for _ in range(max_depth):
+                forward = succ(t1) == t2
+                best = None
+                for t3 in candidates[t2]:
+                    gain = open_gain - dist(t2, t3)
+                    if gain <= EPSILON:
+                        break
+                    if t3 == t1 or t3 == succ(t2) or t3 == pred(t2):
+                        continue
+                    t4 = pred(t3) if forward else succ(t3)
+                    if (min(t3, t4), max(t3, t4)) in added:
+                        continue
+                    score = gain + dist(t3, t4)
+                    if best is None or score > best[0]:
+                        best = (score, t3, t4)
+                if best is None:
+                    break
+                open_gain, t3, t4 = best
+                apply(t2, t1, t3, t4)
+                moves.append((t2, t1, t3, t4))
+                added.add((min(t2, t3), max(t2, t3)))
+                if state['length'] < best_length - EPSILON:
+                    best_length, best_depth = state['length'], len(moves)
+                t2 = t4
+            kept, dropped = moves[:best_depth], moves[best_depth:]
+            undo(dropped)
+            if state['journal'] is not None:
+                del state['journal'][len(state['journal']) - len(dropped):]
+            if best_length < start_length - EPSILON:
+                return [node for move in kept for node in move]
+        return None
+
+    def improve(queue, active):
+        # don't-look bits: only queued nodes are tried, a move requeues its ends
+        while queue:
+            if time.time() - start > time_limit:
+                return
+            node = queue.popleft()
+            active[node] = False
+            touched = lk_chain(node) or or_opt(node, candidates, succ, pred, dist, insert_segment)
+            if touched:
+                for changed in list(touched) + [node]:
+                    if not active[changed]:
+                        active[changed] = True
+                        queue.append(changed)
+
+    active = [True]*node_count
+    improve(deque(range(node_count)), active)
+    best_length = state['length']
+    history = [(round(time.time() - start, 2), best_length)]
+    print('lk local optimum', best_length)
+
+    kicks = 0
+    kick_segment = max(1, min(kick_segment, (node_count - 2) // 2))
+    while time.time() - start < time_limit:
+        # double bridge on two short neighbouring paths: p B C n -> p C B n
+        p = rand.randrange(node_count)
+        b_first = succ(p)
+        b_last = b_first
+        for _ in range(rand.randint(0, kick_segment - 1)):
+            b_last = succ(b_last)
+        c_first = succ(b_last)
+        c_last = c_first
+        for _ in range(rand.randint(0, kick_segment - 1)):
+            c_last = succ(c_last)
+        n = succ(c_last)
+        kicks += 1
+        state['journal'] = []
+        insert_segment(p, b_first, b_last, c_first, c_last, n, True)
+        queue = deque([p, b_first, b_last, c_first, c_last, n])
+        for node in queue:
+            active[node] = True
+        improve(queue, active)
+        if state['length'] < best_length - EPSILON:
+            best_length = state['length']
+            history.append((round(time.time() - start, 2), best_length))
+            print('lk', best_length, 'after', history[-1][0], 's', kicks, 'kicks')
+        else:
+            state['journal'], moves = None, state['journal']
+            undo(moves)
+        state['journal'] = None
+
+    return two_level.to_list(), history
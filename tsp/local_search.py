@@ -0,0 +1,194 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# 2-opt and or-opt on an array tour with a position index, looking only at
+# the candidate neighbours of a node and skipping nodes whose don't-look bit
+# is set (cleared again when a move touches them)
+
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+# improvements smaller than this are float noise
+EPSILON = 1e-7
+OR_OPT_MAX_SEGMENT = 3
+
+
+def hilbert_order(coordinates, bits=16):
+    # cities sorted along a hilbert curve over a 2^bits grid
+    coordinates = np.asarray(coordinates, dtype=np.float64)
+    side = 2**bits
+    origin = coordinates.min(axis=0)
+    extent = max(float((coordinates.max(axis=0) - origin).max()), 1e-9)
+    grid = np.minimum(((coordinates - origin) / extent*side).astype(np.int64), side - 1)
+    x, y = grid[:, 0].copy(), grid[:, 1].copy()
+    index = np.zeros(len(coordinates), dtype=np.int64)
+    s = side // 2
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        index += s*s*((3*rx) ^ ry)
+        # rotate the quadrant so the curve continues in the same orientation
+        flip = ~ry & rx
+        x = np.where(flip, side - 1 - x, x)
+        y = np.where(flip, side - 1 - y, y)
+        swap = ~ry
+        x, y = np.where(swap, y, x), np.where(swap, x, y)
+        s //= 2
+    return np.argsort(index, kind='stable')
+
+
+def nearest_neighbour_tour(coordinates, neighbours):
+    # greedy tour: go to the closest unvisited candidate neighbour, or when all
+    # of them are visited to the next unvisited city along the hilbert curve
+    node_count = len(coordinates)
+    curve = hilbert_order(coordinates).tolist()
+    candidates = neighbours.tolist()
+    visited = [False]*node_count
+    tour = []
+    fallback = 0
+    node = curve[0]
+    while True:
+        visited[node] = True
+        tour.append(node)
+        if len(tour) == node_count:
+            return tour
+        following = -1
+        for neighbour in candidates[node]:
+            if not visited[neighbour]:
+                following = neighbour
+                break
+        if following < 0:
+            while visited[curve[fallback]]:
+                fallback += 1
+            following = curve[fallback]
+        node = following
+
+
+def tour_length(coordinates, tour):
+    points = np.asarray(coordinates, dtype=np.float64)[tour]
+    return float(np.sqrt(((points - np.roll(points, -1, axis=0))**2).sum(axis=1)).sum())
+
+
+def or_opt(a, candidates, succ, pred, dist, insert_segment):
+    # moves the segment of up to OR_OPT_MAX_SEGMENT nodes starting at a
+    # between two nodes next to a candidate neighbour of its ends; succ, pred
+    # and dist read the tour, insert_segment(p, s1, s2, n, e, f, same) moves the
+    # path s1..s2 from between p and n to between e and f, reversed unless
+    # same. returns the touched nodes or None
+    s1 = s2 = a
+    for length in range(1, OR_OPT_MAX_SEGMENT + 1):
+        if length > 1:
+            s2 = succ(s2)
+        p, n = pred(s1), succ(s2)
+        if n == p or s2 == p:
+            return None
+        segment = set([s1, s2]) if length < 3 else set([s1, succ(s1), s2])
+        removed = dist(p, s1) + dist(s2, n) - dist(p, n)
+        if removed <= EPSILON:
+            continue
+        for end in (s1, s2):
+            for c in candidates[end]:
+                if c in segment:
+                    continue
+                for e, f in ((c, succ(c)), (pred(c), c)):
+                    if e in segment or f in segment or (e == p and f == n):
+                        continue
+                    ef = dist(e, f)
+                    same = dist(e, s1) + dist(s2, f) - ef
+                    flipped = dist(e, s2) + dist(s1, f) - ef
+                    if removed - min(same, flipped) > EPSILON:
+                        insert_segment(p, s1, s2, n, e, f, same < flipped)
+                        return (p, n, s1, s2, e, f)
+    return None
+
+
+def local_search(coordinates, tour, neighbours, time_limit=None):
+    # improves tour in place with 2-opt and or-opt moves until no node is left
+    # to look at or the time limit is reached; returns the tour
+    node_count = len(tour)
+    if node_count < 5:
+        return tour
+    start = time.time()
+    xs = np.asarray(coordinates, dtype=np.float64)[:, 0].tolist()
+    ys = np.asarray(coordinates, dtype=np.float64)[:, 1].tolist()
+    candidates = neighbours.tolist()
+    position = [0]*node_count
+    for i, node in enumerate(tour):
+        position[node] = i
+
+    def dist(a, b):
+        return math.hypot(xs[a] - xs[b], ys[a] - ys[b])
+
+    def succ(node):
+        return tour[position[node] + 1 - node_count]
+
+    def pred(node):
+        return tour[position[node] - 1]
+
+    def reverse(i, j):
+        # reverses tour positions i..j (wrapping), or the complement when that
+        # is shorter, which gives the same cycle
+        inner = (j - i) % node_count + 1
+        if 2*inner > node_count:
+            i, j = j + 1, i - 1
+            inner = node_count - inner
+        for _ in range(inner // 2):
+            i %= node_count
+            j %= node_count
+            tour[i], tour[j] = tour[j], tour[i]
+            position[tour[i]] = i
+            position[tour[j]] = j
+            i += 1
+            j -= 1
+
+    def move(a, b, c, d):
+        # 2-opt: tour edges (a, b) and (c, d) become (a, c) and (b, d)
+        if succ(a) == b:
+            reverse(position[b], position[c])
+        else:
+            reverse(position[a], position[d])
+
+    def try_two_opt(a):
+        for forward in (True, False):
+            b = succ(a) if forward else pred(a)
+            ab = dist(a, b)
+            for c in candidates[a]:
+                ac = dist(a, c)
+                if ac >= ab:
+                    break
+                d = succ(c) if forward else pred(c)
+                if c == b or d == a:
+                    continue
+                if ab + dist(c, d) - ac - dist(b, d) > EPSILON:
+                    move(a, b, c, d)
+                    return (a, b, c, d)
+        return None
+
+    def insert_segment(p, s1, s2, n, e, f, same):
+        # three 2-opt moves put the segment between e and f (two when it goes
+        # in reversed)
+        move(p, s1, e, f)
+        move(p, e, n, s2)
+        if same:
+            move(e, s2, s1, f)
+
+    active = [True]*node_count
+    queue = deque(tour)
+    while queue:
+        if time_limit is not None and time.time() - start > time_limit:
+            break
+        node = queue.popleft()
+        active[node] = False
+        touched = try_two_opt(node) or or_opt(node, candidates, succ, pred, dist, insert_segment)
+        if touched:
+            for changed in touched:
+                if not active[changed]:
+                    active[changed] = True
+                    queue.append(changed)
+            if not active[node]:
+                active[node] = True
+                queue.append(node)
+    return tour
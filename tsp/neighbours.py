@@ -0,0 +1,114 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# k nearest neighbour candidate lists from a uniform grid: the cities are
+# bucketed into cells of about two cities each, and the cities of one cell
+# look for their neighbours in the block of cells around it, growing the block
+# until the k-th distance is inside it. a cell holding many more cities than
+# that (a dense cluster) gets its own grid first, and distances are computed in
+# chunks so the temporaries stay bounded
+
+import numpy as np
+
+CITIES_PER_CELL = 2.0
+# cells with more cities are first solved with a grid over their own cities
+MAX_CELL_CITIES = 256
+# entries of one members x candidates distance block
+CHUNK_ENTRIES = 2**20
+
+
+def build_grid(coordinates):
+    # returns (cell of every city, cities sorted by cell, first sorted position
+    # of every cell plus the end, cells per side, cell size, grid origin)
+    node_count = len(coordinates)
+    origin = coordinates.min(axis=0)
+    extent = max(float((coordinates.max(axis=0) - origin).max()), 1e-9)
+    side = max(int(np.ceil(np.sqrt(node_count / CITIES_PER_CELL))), 1)
+    size = extent / side
+    cell_xy = np.minimum(((coordinates - origin) / size).astype(np.int64), side - 1)
+    cells = cell_xy[:, 1]*side + cell_xy[:, 0]
+    order = np.argsort(cells, kind='stable')
+    cell_start = np.searchsorted(cells[order], np.arange(side*side + 1))
+    return cell_xy, order, cell_start, side, size, origin
+
+
+def border_distance(points, low_x, high_x, low_y, high_y, side, size):
+    # distance from the points (relative to the grid origin) to the border of
+    # the block of cells low..high; grid edges are no border
+    border = np.full(len(points), np.inf)
+    if low_x > 0:
+        border = np.minimum(border, points[:, 0] - low_x*size)
+    if high_x < side - 1:
+        border = np.minimum(border, (high_x + 1)*size - points[:, 0])
+    if low_y > 0:
+        border = np.minimum(border, points[:, 1] - low_y*size)
+    if high_y < side - 1:
+        border = np.minimum(border, (high_y + 1)*size - points[:, 1])
+    return border
+
+
+def nearest_among(coordinates, members, candidates, k):
+    # (nearest candidate positions sorted closest first, squared distances)
+    # for every member, members x candidates computed a chunk at a time
+    nearest = np.empty((len(members), k), dtype=np.int64)
+    squared = np.empty((len(members), k))
+    cx, cy = coordinates[candidates, 0], coordinates[candidates, 1]
+    chunk = max(CHUNK_ENTRIES // len(candidates), 1)
+    for first in range(0, len(members), chunk):
+        rows = members[first:first + chunk]
+        dx = coordinates[rows, 0, None] - cx[None, :]
+        dy = coordinates[rows, 1, None] - cy[None, :]
+        dx *= dx
+        dy *= dy
+        dx += dy
+        dx[candidates[None, :] == rows[:, None]] = np.inf
+        part = np.argpartition(dx, k - 1, axis=1)[:, :k]
+        part_squared = np.take_along_axis(dx, part, axis=1)
+        by_distance = np.argsort(part_squared, axis=1)
+        nearest[first:first + chunk] = np.take_along_axis(part, by_distance, axis=1)
+        squared[first:first + chunk] = np.take_along_axis(part_squared, by_distance, axis=1)
+    return nearest, squared
+
+
+def nearest_neighbours(coordinates, k=8):
+    # (n, k) int32 array, row i holds the k cities closest to city i, closest first
+    coordinates = np.asarray(coordinates, dtype=np.float64)
+    node_count = len(coordinates)
+    k = min(k, node_count - 1)
+    neighbours = np.zeros((node_count, max(k, 0)), dtype=np.int32)
+    if k <= 0:
+        return neighbours
+    cell_xy, order, cell_start, side, size, origin = build_grid(coordinates)
+
+    for cell in np.flatnonzero(np.diff(cell_start)).tolist():
+        members = order[cell_start[cell]:cell_start[cell + 1]]
+        cx, cy = cell % side, cell // side
+
+        if MAX_CELL_CITIES < len(members) < node_count:
+            # over-full cell: neighbours within the cell from its own grid, final
+            # for the cities whose k-th one is closer than the cell border
+            inner = nearest_neighbours(coordinates[members], k)
+            delta = coordinates[members[inner[:, -1]]] - coordinates[members]
+            kth = (delta*delta).sum(axis=1)
+            border = border_distance(coordinates[members] - origin, cx, cx, cy, cy, side, size)
+            done = kth <= border*border
+            neighbours[members[done]] = members[inner[done]]
+            members = members[~done]
+
+        radius = 1
+        while len(members):
+            low_x, high_x = max(cx - radius, 0), min(cx + radius, side - 1)
+            low_y, high_y = max(cy - radius, 0), min(cy + radius, side - 1)
+            candidates = np.concatenate([order[cell_start[row*side + low_x]:cell_start[row*side + high_x + 1]]
+                                         for row in range(low_y, high_y + 1)])
+            if len(candidates) > k:
+                nearest, squared = nearest_among(coordinates, members, candidates, k)
+                # the block is exact for a city when its k-th distance does not
+                # reach past the block border
+                border = border_distance(coordinates[members] - origin,
+                                         low_x, high_x, low_y, high_y, side, size)
+                done = squared[:, -1] <= border*border
+                neighbours[members[done]] = candidates[nearest[done]]
+                members = members[~done]
+            radius += 1
+    return neighbours
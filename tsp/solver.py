@@ -1,60 +1,72 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
-import math
-from collections import namedtuple
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from instance_parser import parse_tsp
+import numpy as np
+from distances import distance_matrix, OnDemandDistances
+from neighbours import nearest_neighbours
+from local_search import nearest_neighbour_tour, local_search, tour_length
+from lin_kernighan import lin_kernighan
 from ortools.constraint_solver import pywrapcp
 from ortools.constraint_solver import routing_enums_pb2
 
+# the routing callback takes integer costs, so the matrix is built as rounded
+# int32 and handed to it without a copy; above the cap in bytes the matrix is
+# not stored and rows are computed when needed
+DISTANCE_DTYPE = np.int32
+DISTANCE_MEMORY_CAP = 2*1024**3
+# 'routing' runs or-tools guided local search, 'local_search' 2-opt and or-opt
+# over the CANDIDATE_COUNT nearest neighbours of every city, 'lin_kernighan'
+# continues from there with lk chains and double bridge kicks
+ENGINE = 'routing'
+CANDIDATE_COUNT = 8
+LOCAL_SEARCH_TIME_LIMIT = 600.0
+LK_TIME_LIMIT = 600.0
 
-def build_distance_matrix(coordinates):
-    distance_matrix =[]
-    for point1 in coordinates:
-        point1_distance_vector = []
-        for point2 in coordinates:
-            distance = length(point1, point2)
-            point1_distance_vector.append(distance)
-        distance_matrix.append(point1_distance_vector)
-    return distance_matrix
 
+def flat_distances(dist_matrix):
+    # the distances row after row as a flat int memoryview, what the callback
+    # reads instead of nested python lists; an int32 matrix is wrapped as it
+    # is, any other dtype is truncated into one int32 copy
+    values = np.asarray(dist_matrix).astype(np.intc, copy=False)
+    return memoryview(np.ascontiguousarray(values).reshape(-1))
 
 
 # Distance callback
-def create_distance_callback(dist_matrix):
+def create_distance_callback(dist_matrix, nodes=None):
   # Create a callback to calculate distances nodes
-
-  def distance_callback(from_node, to_node):
-    return int(dist_matrix[from_node][to_node])
+  # nodes maps solver indices to nodes for the routing versions that call
+  # back with indices; it is looked up once here instead of on every call
+  node_count = len(dist_matrix)
+  if isinstance(dist_matrix, OnDemandDistances):
+    def distance_callback(from_node, to_node):
+      return int(dist_matrix.distance(from_node, to_node))
+    return distance_callback
+
+  flat = flat_distances(dist_matrix)
+  if nodes is None:
+    def distance_callback(from_node, to_node):
+      return flat[from_node*node_count + to_node]
+  else:
+    nodes = list(nodes)
+    row_start = [node*node_count for node in nodes]
+
+    def distance_callback(from_index, to_index):
+      return flat[row_start[from_index] + nodes[to_index]]
 
   return distance_callback
 
 
+def solve_with_routing(coordinates):
+    # or-tools routing with guided local search; returns (route, objective)
+    nodeCount = len(coordinates)
 
+    dist_matrix = distance_matrix(coordinates, DISTANCE_DTYPE, DISTANCE_MEMORY_CAP)
 
-
-Point = namedtuple("Point", ['x', 'y'])
-
-def length(point1, point2):
-    return math.sqrt((point1.x - point2.x)**2 + (point1.y - point2.y)**2)
-
-def solve_it(input_data):
-    # Modify this code to run your optimization algorithm
-
-    # parse the input
-    lines = input_data.split('\n')
-
-    nodeCount = int(lines[0])
-
-    points = []
-    for i in range(1, nodeCount+1):
-        line = lines[i]
-        parts = line.split()
-        points.append(Point(float(parts[0]), float(parts[1])))
-
-
-    distance_matrix = build_distance_matrix(points)
-
-    tsp_size = len(points)
+    tsp_size = nodeCount
     print('tsp_size', tsp_size)
     num_routes = 1
     starting_point = 0
@@ -67,7 +79,7 @@ def solve_it(input_data):
             routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH)
         search_parameters.time_limit_ms = 20000
         # Create the distance callback.
-        dist_callback = create_distance_callback(distance_matrix)
+        dist_callback = create_distance_callback(dist_matrix)
         routing.SetArcCostEvaluatorOfAllVehicles(dist_callback)
         # Solve the problem.
         assignment = routing.SolveWithParameters(search_parameters)
@@ -93,17 +105,48 @@ def solve_it(input_data):
     else:
         print ('Specify an instance greater than 0')
 
+    # calculate the length of the tour
+    return route, assignment.ObjectiveValue()
 
-    # build a trivial solution
-    # visit the nodes in the order they appear in the file
-    solution = route
-    #print(solution)
 
-    # calculate the length of the tour
-    obj = str(assignment.ObjectiveValue())
+def solve_with_local_search(coordinates):
+    # greedy tour over the candidate lists improved by 2-opt and or-opt
+    neighbours = nearest_neighbours(coordinates, CANDIDATE_COUNT)
+    tour = nearest_neighbour_tour(coordinates, neighbours)
+    print('greedy tour length', tour_length(coordinates, tour))
+    tour = local_search(coordinates, tour, neighbours, LOCAL_SEARCH_TIME_LIMIT)
+    length = tour_length(coordinates, tour)
+    print('local search tour length', length)
+    return tour, length
+
+
+def solve_with_lin_kernighan(coordinates):
+    neighbours = nearest_neighbours(coordinates, CANDIDATE_COUNT)
+    tour = nearest_neighbour_tour(coordinates, neighbours)
+    tour = local_search(coordinates, tour, neighbours, LOCAL_SEARCH_TIME_LIMIT)
+    print('local search tour length', tour_length(coordinates, tour))
+    tour, history = lin_kernighan(coordinates, tour, neighbours, LK_TIME_LIMIT)
+    print('lk first local optimum', history[0], 'best', history[-1], len(history) - 1, 'improvements')
+    return tour, tour_length(coordinates, tour)
+
+
+ENGINES = {
+    'routing': solve_with_routing,
+    'local_search': solve_with_local_search,
+    'lin_kernighan': solve_with_lin_kernighan,
+}
+
+
+def solve_it(input_data):
+    # Modify this code to run your optimization algorithm
+
+    # parse the input
+    instance = parse_tsp(input_data)
+
+    solution, obj = ENGINES[ENGINE](instance.coordinates)
 
     # prepare the solution in the specified output format
-    output_data = obj + ' ' + str(0) + '\n'
+    output_data = str(obj) + ' ' + str(0) + '\n'
     output_data += ' '.join(map(str, solution))
 
     return output_data
@@ -0,0 +1,130 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import math
+
+
+class TwoLevelTour(object):
+    '''
+    Tour as a cyclic sequence of segments of about sqrt(n) cities, each with
+    a reversed flag. Reversing a path splits the segments at its ends and then
+    only reverses the order and flips the flags of the segments in between,
+    so a 2-opt move costs O(sqrt(n)) instead of O(n). Splits add segments, the
+    structure is rebuilt once there are too many.
+    '''
+
+    def __init__(self, tour, segment_size=None):
+        self.node_count = len(tour)
+        self.segment_size = segment_size or max(int(math.sqrt(self.node_count)), 8)
+        self.seg_of = [0]*self.node_count
+        self.index = [0]*self.node_count
+        self.rebuild(tour)
+
+    def rebuild(self, tour):
+        size = self.segment_size
+        self.nodes = [list(tour[first:first + size]) for first in range(0, len(tour), size)]
+        self.reversed = [False]*len(self.nodes)
+        self.order = list(range(len(self.nodes)))
+        self.seg_pos = list(range(len(self.nodes)))
+        for segment, nodes in enumerate(self.nodes):
+            for i, node in enumerate(nodes):
+                self.seg_of[node] = segment
+                self.index[node] = i
+
+    def to_list(self):
+        tour = []
+        for segment in self.order:
+            tour.extend(reversed(self.nodes[segment]) if self.reversed[segment] else self.nodes[segment])
+        return tour
+
+    def first(self, segment):
+        return self.nodes[segment][-1 if self.reversed[segment] else 0]
+
+    def last(self, segment):
+        return self.nodes[segment][0 if self.reversed[segment] else -1]
+
+    def succ(self, node):
+        segment = self.seg_of[node]
+        i = self.index[node]
+        if self.reversed[segment]:
+            if i > 0:
+                return self.nodes[segment][i - 1]
+        elif i + 1 < len(self.nodes[segment]):
+            return self.nodes[segment][i + 1]
+        following = self.order[self.seg_pos[segment] + 1 - len(self.order)]
+        return self.first(following)
+
+    def pred(self, node):
+        segment = self.seg_of[node]
+        i = self.index[node]
+        if not self.reversed[segment]:
+            if i > 0:
+                return self.nodes[segment][i - 1]
+        elif i + 1 < len(self.nodes[segment]):
+            return self.nodes[segment][i + 1]
+        previous = self.order[self.seg_pos[segment] - 1]
+        return self.last(previous)
+
+    def split_before(self, node):
+        # makes node the first city of its segment; the cities before it stay
+        # in the old segment and node onwards go to a new one right after it
+        segment = self.seg_of[node]
+        nodes = self.nodes[segment]
+        i = self.index[node]
+        if self.reversed[segment]:
+            if i == len(nodes) - 1:
+                return
+            # in tour order the cities before node are the internal tail
+            head, tail = nodes[i + 1:], nodes[:i + 1]
+            for j, member in enumerate(head):
+                self.index[member] = j
+        else:
+            if i == 0:
+                return
+            head, tail = nodes[:i], nodes[i:]
+            for j, member in enumerate(tail):
+                self.index[member] = j
+        new = len(self.nodes)
+        self.nodes[segment] = head
+        self.nodes.append(tail)
+        self.reversed.append(self.reversed[segment])
+        self.seg_pos.append(0)
+        for member in tail:
+            self.seg_of[member] = new
+        position = self.seg_pos[segment] + 1
+        self.order.insert(position, new)
+        for j in range(position, len(self.order)):
+            self.seg_pos[self.order[j]] = j
+
+    def reverse_path(self, first, last):
+        # reverses the tour path first..last, or the rest of the tour when
+        # that spans fewer segments, which gives the same cycle
+        self.split_before(first)
+        following = self.succ(last)
+        if following == first:
+            return
+        self.split_before(following)
+        count = len(self.order)
+        start = self.seg_pos[self.seg_of[first]]
+        end = self.seg_pos[self.seg_of[last]]
+        inner = (end - start) % count + 1
+        if 2*inner > count:
+            start, end = end + 1, start - 1
+            inner = count - inner
+        for k in range(inner // 2):
+            a, b = (start + k) % count, (end - k) % count
+            self.order[a], self.order[b] = self.order[b], self.order[a]
+        for k in range(inner):
+            j = (start + k) % count
+            segment = self.order[j]
+            self.reversed[segment] = not self.reversed[segment]
+            self.seg_pos[segment] = j
+        if count > 4*max(self.node_count // self.segment_size, 1):
+            self.rebuild(self.to_list())
+
+    def move(self, a, b, c, d):
+        # 2-opt: tour edges (a, b) and (c, d) become (a, c) and (b, d)
+        if self.succ(a) == b:
+            self.reverse_path(b, c)
+        else:
+            self.reverse_path(a, d)
@@ -2,6 +2,10 @@
 # -*- coding: utf-8 -*-
 
 import math
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from instance_parser import parse_vrp
 from collections import namedtuple
 from ortools.constraint_solver import pywrapcp
 from ortools.constraint_solver import routing_enums_pb2
@@ -42,25 +46,22 @@ def solve_it(input_data):
     # Modify this code to run your optimization algorithm
 
     # parse the input
-    lines = input_data.split('\n')
+    instance = parse_vrp(input_data)
     data = {}
     data['locations'] = {}
     data['demands'] = {}
-    parts = lines[0].split()
-    customer_count = int(parts[0])
-    vehicle_count = int(parts[1])
-    vehicle_capacity = int(parts[2])
+    customer_count = len(instance.demands)
+    vehicle_count = instance.vehicle_count
+    vehicle_capacity = instance.vehicle_capacity
     data['num_locations'] = customer_count
     data['num_vehicles'] = vehicle_count
     data["depot"] = 0
     data['vehicle_capacities'] = [vehicle_capacity]*vehicle_count
     
     customers = []
-    for i in range(customer_count):
-        line = lines[i]
-        parts = line.split()
-        data['locations'][i] = (float(parts[1]), float(parts[2]))
-        data['demands'][i] = int(parts[0])
+    for i, (demand, (x, y)) in enumerate(zip(instance.demands.tolist(), instance.coordinates.tolist())):
+        data['locations'][i] = (x, y)
+        data['demands'][i] = demand
 
     #the depot is always the first customer in the input
     depot = 0